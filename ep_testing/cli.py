@@ -0,0 +1,212 @@
+"""The `ep-testing` command line entry point
+
+Only argparse and the (dependency free) configuration module are imported up front.  Everything else, including
+requests, the downloader and the test modules, is imported inside the subcommand that needs it, so `--help` and
+dispatch stay fast when the tool is called from many short orchestration steps.
+"""
+import argparse
+import sys
+import time
+from tempfile import mkdtemp
+from typing import List, Optional
+
+from ep_testing.config import CONFIGURATIONS, WORKLOADS
+
+_PROCESS_START = time.perf_counter()
+
+
+class ImportTimer:
+    """Accumulates the time spent in the deferred imports of a subcommand"""
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.elapsed += time.perf_counter() - self._start
+
+
+def _comma_list(value: str) -> List[str]:
+    return [v.strip() for v in value.split(',') if v.strip()]
+
+
+def _fetch(args, import_timer: ImportTimer) -> int:
+    with import_timer:
+        from ep_testing.config import TestConfiguration
+        from ep_testing.downloader import Downloader
+    d = Downloader(TestConfiguration(args.run_config, args.msvc_version), args.download_dir or mkdtemp(), extract=False)
+    print(d.download_path)
+    return 0
+
+
+def _extract(args, import_timer: ImportTimer) -> int:
+    with import_timer:
+        from ep_testing.config import TestConfiguration
+        from ep_testing.downloader import Downloader
+    d = Downloader(
+        TestConfiguration(args.run_config, args.msvc_version), args.extract_dir or mkdtemp(),
+        use_local=args.archive, required_paths=args.paths
+    )
+    print(d.extracted_install_path)
+    return 0
+
+
+def _test(args, import_timer: ImportTimer) -> int:
+    with import_timer:
+        from ep_testing.runner import run_tests
+    run_tests(
+        args.run_config, args.msvc_version, args.use_local_copy, args.verbose, args.results_store, args.rerun_failed,
+        args.only, args.full_extract, 'sanity', args.overlapped, history_database=args.history_database,
+        profile=args.profile
+    )
+    return 0
+
+
+def _bench(args, import_timer: ImportTimer) -> int:
+    with import_timer:
+        from ep_testing.runner import run_tests
+    run_tests(
+        args.run_config, args.msvc_version, args.use_local_copy, args.verbose, args.results_store,
+        full_extract=args.full_extract, workload=args.workload, history_database=args.history_database,
+        profile=args.profile
+    )
+    return 0
+
+
+def _sweep(args, import_timer: ImportTimer) -> int:
+    with import_timer:
+        from ep_testing.runner import run_tests
+        from ep_testing.tests.annual import TestAnnualWeatherRun
+    tests = [(TestAnnualWeatherRun, {'test_file': f, 'weather_file': args.weather_file}) for f in args.files]
+    results = run_tests(
+        args.run_config, args.msvc_version, args.use_local_copy, args.verbose, args.results_store,
+        full_extract=args.full_extract, tests=tests, history_database=args.history_database, profile=args.profile
+    )
+    print('%-45s %12s %18s' % ('File', 'Wall time', 'Sim hours/sec'))
+    for result in results:
+        m = result['measurements']
+        print('%-45s %11.2fs %18.1f' % (result['kwargs']['test_file'], m['wall_time'], m['simulated_hours_per_second']))
+    return 0
+
+
+def _history(args, import_timer: ImportTimer) -> int:
+    with import_timer:
+        from datetime import datetime
+        from ep_testing.history import DEFAULT_HISTORY_DATABASE, HistoryDatabase
+    db = HistoryDatabase(args.history_database or DEFAULT_HISTORY_DATABASE)
+    if args.query == 'trend':
+        rows = db.trend(args.metric, args.test, args.subject, args.run_config)
+        print('%-19s %-18s %-10s %-12s %-16s %-28s %-30s %14s' % (
+            'Time', 'Config', 'Tag', 'Package', 'Host', 'Test', 'Subject', args.metric
+        ))
+        for timestamp, config_key, release_tag, package_hash, host, test, subject, value in rows:
+            print('%-19s %-18s %-10s %-12s %-16s %-28s %-30s %14.4g' % (
+                datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S'), config_key, release_tag,
+                package_hash[:12], host, test, subject[:30], value
+            ))
+        return 0
+    regressions = db.regressions(args.significance, args.min_change)
+    for r in regressions:
+        print('%s / %s / %s / %s (host %s): %.1f%% slower from %s on (%.4g -> %.4g, p = %.4f)' % (
+            r['config_key'], r['test'], r['subject'][:30], r['metric'], r['host'],
+            r['slowdown'] * 100, r['first_slow_release'], r['before_mean'], r['after_mean'], r['p_value']
+        ))
+    if not regressions:
+        print('No significant slowdowns found')
+    return 1 if regressions else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='ep-testing', description='Test and benchmark EnergyPlus packages')
+    parser.add_argument('--import-time', action='store_true', help='Report time spent on imports and startup')
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    config_options = argparse.ArgumentParser(add_help=False)
+    config_options.add_argument('--run-config', required=True, choices=sorted(CONFIGURATIONS),
+                                help='Run configuration, see possible options in config.py')
+    config_options.add_argument('--msvc-version', type=int, default=None,
+                                help='For Windows only, the MSVC generator version to use, e.g. 16 for VS 2019')
+
+    package_options = argparse.ArgumentParser(add_help=False)
+    package_options.add_argument('--use-local-copy', '-x', default=None,
+                                 help='Path to a local E+ copy, either an archive or an extracted directory')
+    package_options.add_argument('--results-store', default=None,
+                                 help='Path to the JSON results store, defaults to ~/.ep_testing/results.json')
+    package_options.add_argument('--full-extract', action='store_true',
+                                 help='Extract the whole package up front instead of only the paths the tests need')
+    package_options.add_argument('--verbose', action='store_true', help='Enable verbose mode')
+    package_options.add_argument('--history-database', default=None,
+                                 help='Path to the SQLite history database, defaults to ~/.ep_testing/history.sqlite')
+    package_options.add_argument('--profile', type=_comma_list, default=None,
+                                 help='Comma separated list of test class names whose subprocesses to run under a '
+                                      'profiler, defaults to the EP_TESTING_PROFILE environment variable')
+
+    p = subparsers.add_parser('fetch', parents=[config_options], help='Download the package without extracting it')
+    p.add_argument('--download-dir', default=None, help='Directory to download into, defaults to a new temp dir')
+    p.set_defaults(handler=_fetch)
+
+    p = subparsers.add_parser('extract', parents=[config_options], help='Extract all or part of a package archive')
+    p.add_argument('--archive', required=True, help='Path to the package archive to extract')
+    p.add_argument('--extract-dir', default=None, help='Directory to extract into, defaults to a new temp dir')
+    p.add_argument('--paths', nargs='+', default=None,
+                   help='Install-relative paths or globs to extract besides the root level files; default is all')
+    p.set_defaults(handler=_extract)
+
+    p = subparsers.add_parser('test', parents=[config_options, package_options], help='Run the installer tests')
+    p.add_argument('--rerun-failed', action='store_true', help='Skip tests that already passed on this exact package')
+    p.add_argument('--only', type=_comma_list, default=None,
+                   help='Comma separated list of test class names to run, e.g. TestPythonAPIAccess')
+    p.add_argument('--overlapped', action='store_true',
+                   help='Extract the package test by test, starting each test as soon as its own paths have '
+                        'landed, and report the critical path')
+    p.set_defaults(handler=_test)
+
+    p = subparsers.add_parser('bench', parents=[config_options, package_options],
+                              help='Run a performance workload, or the opt-in documentation check')
+    p.add_argument('--workload', choices=[w for w in WORKLOADS if w != 'sanity'], default='annual',
+                   help='Which workload to run, documentation checks the version string in every PDF')
+    p.set_defaults(handler=_bench)
+
+    p = subparsers.add_parser('sweep', parents=[config_options, package_options],
+                              help='Run the annual workload across a set of example files and tabulate throughput')
+    p.add_argument('--files', nargs='+', required=True, help='ExampleFiles IDFs to sweep over')
+    p.add_argument('--weather-file', default='USA_CO_Golden-NREL.724666_TMY3.epw', help='WeatherData EPW to use')
+    p.set_defaults(handler=_sweep)
+
+    p = subparsers.add_parser('history', help='Query recorded timings across runs, or look for regressions')
+    p.add_argument('--history-database', default=None,
+                   help='Path to the SQLite history database, defaults to ~/.ep_testing/history.sqlite')
+    history_queries = p.add_subparsers(dest='query', metavar='query')
+    history_queries.required = True
+    q = history_queries.add_parser('trend', help='Show one metric across all recorded runs, oldest first')
+    q.add_argument('--metric', default='duration', help='Metric name, e.g. duration or simulated_hours_per_second')
+    q.add_argument('--test', default=None, help='Only show this test class')
+    q.add_argument('--subject', default=None, help='Only show this subject, usually an IDF name')
+    q.add_argument('--run-config', default=None, help='Only show this run configuration')
+    q = history_queries.add_parser('regressions', help='Flag statistically significant slowdowns, exits 1 if any')
+    q.add_argument('--significance', type=float, default=0.01, help='p-value threshold for a change point')
+    q.add_argument('--min-change', type=float, default=0.05, help='Minimum relative slowdown to report, e.g. 0.05')
+    p.set_defaults(handler=_history)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    dispatch_time = time.perf_counter() - _PROCESS_START
+    import_timer = ImportTimer()
+    try:
+        return args.handler(args, import_timer)
+    finally:
+        if args.import_time:
+            print('[import-time] cli import to dispatch: %.1f ms, deferred imports for "%s": %.1f ms' % (
+                dispatch_time * 1000, args.command, import_timer.elapsed * 1000
+            ), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -32,6 +32,10 @@ CONFIGURATIONS = {
     },
 }
 
+# the sanity workload is the installer test suite, documentation is the opt-in PDF version check (it needs pdftotext),
+# the others are performance workloads, see tester.py
+WORKLOADS = ['sanity', 'documentation', 'annual', 'pipeline', 'scaling', 'callbacks', 'plugins']
+
 
 class TestConfiguration:
 
@@ -1,52 +1,83 @@
 from distutils import log
-from typing import List, Union
+from fnmatch import fnmatch
+from glob import glob
+from typing import List, Optional, Set, Union
 import os
 import requests
 import shutil
 from subprocess import check_call, CalledProcessError, STDOUT
+import tarfile
+from tempfile import mkstemp
 from typing import Tuple
 import urllib.request
+import zipfile
 
 from ep_testing.exceptions import EPTestingException
 from ep_testing.config import TestConfiguration, OS
 
 
+def missing_package_paths(install_root: str, paths: List[str]) -> List[str]:
+    """Returns the entries of paths (or glob patterns) that do not exist under an extracted install root"""
+    return [p for p in paths if not glob(os.path.join(install_root, *p.rstrip('/').split('/')))]
+
+
 class Downloader:
     Release_url = 'https://api.github.com/repos/NREL/EnergyPlus/releases'
     User_url = 'https://api.github.com/user'
 
-    def __init__(self, config: TestConfiguration, download_dir: str, use_local: str = '', announce: callable = None):
+    def __init__(self, config: TestConfiguration, download_dir: str, use_local: str = '', announce: callable = None,
+                 required_paths: Optional[List[str]] = None, extract: bool = True):
+        """Downloads and extracts the package for this configuration
+
+        If required_paths is None, the whole package is extracted.  Otherwise only the root level files plus the
+        members matching required_paths are extracted up front, and anything else can be pulled in later on demand
+        through ensure_extracted.  If extract is False, only the download happens, and the caller is responsible for
+        calling prepare_partial_extraction and extracting what it needs.
+        """
         self.release_tag = config.tag_this_version
         self.download_dir = download_dir
         self.announce = announce  # hijacking this instance method is mildly dangerous, like 1/5 danger stars
-        github_token = os.environ.get('GITHUB_TOKEN', None)
-        if github_token is None:
-            raise EPTestingException('GITHUB_TOKEN not found in environment, cannot continue')
-        self.auth_header = {'Authorization': 'token %s' % github_token}
-        user_response = requests.get(self.User_url, headers=self.auth_header)
-        if user_response.status_code == 403:
-            if 'rate limit' in user_response.json()['message']:
-                raise EPTestingException('Rate limit somehow exceeded, weird!')
-            raise EPTestingException('Permission issue when calling Github API')
-        elif user_response.status_code != 200:
-            raise EPTestingException('Invalid call to Github API -- check GITHUB_TOKEN validity')
-        self._my_print('Executing download operations as Github user: ' + user_response.json()['login'])
+        self.auth_header: Optional[dict] = None  # only set up when actually downloading, see _authenticate
         extract_dir_name = 'ep_package'
         self.extract_path = os.path.join(self.download_dir, extract_dir_name)
         # need to adapt this to the new filename structure when we get there
         self.asset_pattern = config.asset_pattern
         target_file_name, self.extract_command = self._get_extract_vars(config)
         self.download_path = os.path.join(self.download_dir, target_file_name)
+        self.archive_root_name = ''
+        self.archive_members: List[str] = []
+        self.extracted_members: Set[str] = set()
         if use_local:
-            shutil.copy(use_local, self.download_dir)
+            shutil.copy(use_local, self.download_path)
         else:
+            self._authenticate()
             releases = self._get_all_packages()
             matching_release = self._find_matching_release(releases)
             asset = self._find_matching_asset_for_release(matching_release)
             if asset is None:
                 raise EPTestingException('Could not find asset to download, has CI finished it yet?')
             self._download_asset(asset)
-        self.extracted_install_path = self._extract_asset()
+        if not extract:
+            self.extracted_install_path = None
+        elif required_paths is None:
+            self.extracted_install_path = self._extract_asset()
+        else:
+            self.extracted_install_path = self._extract_asset_partially(required_paths)
+
+    def _authenticate(self) -> None:
+        """Checks the GITHUB_TOKEN against the Github API, only needed (and only called) when downloading a package"""
+        github_token = os.environ.get('GITHUB_TOKEN', None)
+        if github_token is None:
+            raise EPTestingException('GITHUB_TOKEN not found in environment, cannot continue')
+        self.auth_header = {'Authorization': 'token %s' % github_token}
+        user_response = requests.get(self.User_url, headers=self.auth_header)
+        if user_response.status_code == 403:
+            if 'rate limit' in user_response.json()['message']:
+                raise EPTestingException('Rate limit somehow exceeded, weird!')
+            raise EPTestingException('Permission issue when calling Github API')
+        elif user_response.status_code != 200:
+            raise EPTestingException('Invalid call to Github API -- check GITHUB_TOKEN validity')
+        self._my_print('Executing download operations as Github user: ' + user_response.json()['login'])
 
     def _get_extract_vars(self, config) -> Tuple[str, str]:
         target_file_name = ''
@@ -136,12 +167,7 @@ class Downloader:
         """Attempts to extract the downloaded package, returns the path to the E+ install subdirectory"""
         saved_working_directory = os.getcwd()
         os.chdir(self.download_dir)
-        if os.path.exists(self.extract_path):
-            shutil.rmtree(self.extract_path)
-        try:
-            os.makedirs(self.extract_path)
-        except Exception as e:
-            raise EPTestingException('Could not create extraction path at %s; error: %s' % (self.extract_path, str(e)))
+        self._prepare_extract_path()
         try:
             self._my_print("Extracting asset...")
             dev_null = open(os.devnull, 'w')
@@ -156,6 +182,100 @@ class Downloader:
         os.chdir(saved_working_directory)
         return all_sub_folders[0]
 
+    def _prepare_extract_path(self) -> None:
+        if os.path.exists(self.extract_path):
+            shutil.rmtree(self.extract_path)
+        try:
+            os.makedirs(self.extract_path)
+        except Exception as e:
+            raise EPTestingException('Could not create extraction path at %s; error: %s' % (self.extract_path, str(e)))
+
+    def _list_archive_members(self) -> List[str]:
+        """Returns the file (non-directory) member names in the downloaded archive"""
+        try:
+            if zipfile.is_zipfile(self.download_path):
+                with zipfile.ZipFile(self.download_path) as z:
+                    return [i.filename for i in z.infolist() if not i.is_dir()]
+            with tarfile.open(self.download_path) as t:
+                return [m.name for m in t.getmembers() if not m.isdir()]
+        except (OSError, tarfile.TarError, zipfile.BadZipFile) as e:
+            raise EPTestingException('Could not list contents of archive %s; error: %s' % (self.download_path, str(e)))
+
+    @staticmethod
+    def _install_relative_name(member_name: str) -> Tuple[str, str]:
+        """Splits an archive member name into the top level package directory and the install-relative path"""
+        normalized = member_name.replace('\\', '/')
+        if normalized.startswith('./'):
+            normalized = normalized[2:]
+        root, _, relative = normalized.partition('/')
+        return root, relative
+
+    @staticmethod
+    def _member_matches(relative_name: str, paths: List[str], include_root_files: bool = True) -> bool:
+        if '/' not in relative_name:
+            return include_root_files  # root level files (binaries, libraries, IDD) are normally always needed
+        for p in paths:
+            p = p.rstrip('/')
+            if relative_name.startswith(p + '/') or fnmatch(relative_name, p):
+                return True
+        return False
+
+    def extraction_command(self, member_names: List[str]) -> List[str]:
+        """Returns a command line that extracts just the given members, to be run in the download directory"""
+        handle, list_file_path = mkstemp(suffix='.txt', prefix='members_', dir=self.download_dir)
+        with os.fdopen(handle, 'w') as f:
+            f.write('\n'.join(member_names) + '\n')
+        if self.extract_command[0] == 'tar':
+            return self.extract_command + ['-T', list_file_path]
+        return self.extract_command + ['@' + list_file_path]
+
+    def _extract_members(self, member_names: List[str]) -> None:
+        command = self.extraction_command(member_names)
+        try:
+            dev_null = open(os.devnull, 'w')
+            check_call(command, stdout=dev_null, stderr=STDOUT, cwd=self.download_dir)
+        except CalledProcessError as e:
+            raise EPTestingException("Extraction failed with this error: " + str(e))
+        self.extracted_members.update(member_names)
+
+    def prepare_partial_extraction(self) -> str:
+        """Creates an empty extraction directory and lists the archive, returns the path the install will land at"""
+        self._prepare_extract_path()
+        self.archive_members = self._list_archive_members()
+        roots = set(self._install_relative_name(m)[0] for m in self.archive_members)
+        if len(roots) != 1:
+            raise EPTestingException('Extracted EnergyPlus package has more than one directory, problem.')
+        self.archive_root_name = roots.pop()
+        return os.path.join(self.extract_path, self.archive_root_name)
+
+    def _extract_asset_partially(self, required_paths: List[str]) -> str:
+        """Extracts only the root level files and the required paths, returns the path to the E+ install directory"""
+        install_path = self.prepare_partial_extraction()
+        self._my_print("Extracting required parts of asset...")
+        self.ensure_extracted(required_paths)
+        self._my_print(" ...Extraction Complete, %i of %i files extracted" % (
+            len(self.extracted_members), len(self.archive_members)
+        ))
+        return install_path
+
+    def matching_members(self, paths: List[str], include_root_files: bool = True) -> List[str]:
+        """Returns the archive members matching paths that have not been extracted yet"""
+        return [
+            m for m in self.archive_members if m not in self.extracted_members and self._member_matches(
+                self._install_relative_name(m)[1], paths, include_root_files
+            )
+        ]
+
+    def ensure_extracted(self, paths: List[str]) -> int:
+        """Extracts any members matching paths that have not been extracted yet, returns how many were extracted
+
+        This is a no-op when the whole package was extracted up front.
+        """
+        missing = self.matching_members(paths)
+        if missing:
+            self._extract_members(missing)
+        return len(missing)
+
     def _my_print(self, message: str, level: object = log.INFO) -> None:
         if self.announce:
             self.announce(message, level)
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import math
+import os
+import platform
+import random
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_HISTORY_DATABASE = os.path.join(os.path.expanduser('~'), '.ep_testing', 'history.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    config_key TEXT NOT NULL,
+    release_tag TEXT NOT NULL,
+    package_hash TEXT NOT NULL,
+    host_fingerprint TEXT NOT NULL,
+    host_description TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'passed',
+    message TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    test TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS measurements_by_series ON measurements(test, subject, metric);
+"""
+
+# only timings and throughputs are scanned for regressions, counts (warnings, callbacks, timesteps...), ratios and
+# high water marks have no meaningful direction, metrics are matched on the underscore separated words in their names
+HIGHER_IS_BETTER_SUFFIXES = ('per_second', 'throughput')
+LOWER_IS_BETTER_WORDS = {'duration', 'time', 'times', 'seconds', 'overhead'}
+
+
+def host_description() -> dict:
+    return {
+        'node': platform.node(),
+        'system': platform.system(),
+        'release': platform.release(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def host_fingerprint() -> str:
+    return hashlib.sha256(json.dumps(host_description(), sort_keys=True).encode()).hexdigest()[:16]
+
+
+def test_subject(kwargs: dict) -> str:
+    """Returns what a test ran on: its IDF if it has one, otherwise its kwargs"""
+    if 'test_file' in kwargs:
+        return kwargs['test_file']
+    return json.dumps(kwargs, sort_keys=True, default=str)
+
+
+def flatten_measurements(measurements: dict, prefix: str = '') -> Dict[str, float]:
+    """Flattens nested measurement dicts into dotted metric names, keeping only the numeric values"""
+    flat = {}
+    for key, value in measurements.items():
+        name = prefix + str(key)
+        if isinstance(value, dict):
+            flat.update(flatten_measurements(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def metric_direction(metric: str) -> Optional[bool]:
+    """Returns True if higher values of the metric are better, False if lower are, or None if it is not a timing or
+    throughput at all, in which case it is never scanned for regressions"""
+    if metric.rsplit('.', 1)[-1].endswith(HIGHER_IS_BETTER_SUFFIXES):
+        return True
+    if LOWER_IS_BETTER_WORDS.intersection(re.split(r'[._]', metric)):
+        return False
+    return None
+
+
+def _max_split_statistic(values: List[float], min_segment: int) -> Tuple[float, int]:
+    """Returns the largest absolute Welch t statistic over all split points, and the split index it occurs at"""
+    n = len(values)
+    prefix_sum = [0.0]
+    prefix_squares = [0.0]
+    for v in values:
+        prefix_sum.append(prefix_sum[-1] + v)
+        prefix_squares.append(prefix_squares[-1] + v * v)
+    best_t, best_k = 0.0, min_segment
+    for k in range(min_segment, n - min_segment + 1):
+        n_a, n_b = k, n - k
+        mean_a = prefix_sum[k] / n_a
+        mean_b = (prefix_sum[n] - prefix_sum[k]) / n_b
+        var_a = max(prefix_squares[k] / n_a - mean_a * mean_a, 0.0) * n_a / (n_a - 1)
+        var_b = max((prefix_squares[n] - prefix_squares[k]) / n_b - mean_b * mean_b, 0.0) * n_b / (n_b - 1)
+        standard_error = math.sqrt(var_a / n_a + var_b / n_b)
+        if standard_error == 0.0:
+            t = math.inf if mean_a != mean_b else 0.0
+        else:
+            t = abs(mean_b - mean_a) / standard_error
+        if t > best_t:
+            best_t, best_k = t, k
+    return best_t, best_k
+
+
+def detect_change_point(values: List[float], min_segment: int = 3, permutations: int = 1000,
+                        seed: int = 0) -> Optional[dict]:
+    """Finds the most likely single shift in the mean of a chronological series
+
+    The split point is the one maximizing the Welch t statistic between the values before and after it.  Its p-value
+    comes from a permutation test on that same maximum, which accounts for having searched over every split point.
+    Returns None if the series is too short to split.
+    """
+    if len(values) < 2 * min_segment:
+        return None
+    observed, k = _max_split_statistic(values, min_segment)
+    rng = random.Random(seed)
+    shuffled = list(values)
+    at_least_as_extreme = 0
+    for _ in range(permutations):
+        rng.shuffle(shuffled)
+        if _max_split_statistic(shuffled, min_segment)[0] >= observed:
+            at_least_as_extreme += 1
+    before_mean = sum(values[:k]) / k
+    after_mean = sum(values[k:]) / (len(values) - k)
+    return {
+        'index': k,
+        'before_mean': before_mean,
+        'after_mean': after_mean,
+        'relative_change': (after_mean - before_mean) / before_mean if before_mean else math.inf,
+        't_statistic': observed,
+        'p_value': (at_least_as_extreme + 1) / (permutations + 1),
+    }
+
+
+class HistoryDatabase:
+    """An embedded SQLite store of every run's timings and resource usage, for trends and regression detection"""
+
+    def __init__(self, database_path: str = DEFAULT_HISTORY_DATABASE):
+        self.path = database_path
+        database_dir = os.path.dirname(self.path)
+        if database_dir:
+            os.makedirs(database_dir, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(SCHEMA)
+
+    def record_run(self, config_key: str, release_tag: str, package_hash: str, results: List[dict],
+                   status: str = 'passed', message: str = '') -> int:
+        """Records one run, where results are the dicts returned from Tester.run, returns the new run id
+
+        A failed run is recorded with status 'failed', its message, and the results of the tests that did complete.
+        Results of profiled tests are left out, the profiler inflates their timings and would look like a slowdown.
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO runs'
+                ' (timestamp, config_key, release_tag, package_hash, host_fingerprint, host_description, status,'
+                ' message) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (time.time(), config_key, release_tag, package_hash, host_fingerprint(),
+                 json.dumps(host_description(), sort_keys=True), status, message)
+            )
+            run_id = cursor.lastrowid
+            rows = []
+            for result in results:
+                if result.get('profiled'):
+                    continue
+                metrics = {'duration': result['duration']}
+                metrics.update(flatten_measurements(result.get('resources') or {}, 'resources.'))
+                metrics.update(flatten_measurements(result.get('measurements') or {}))
+                subject = test_subject(result['kwargs'])
+                rows.extend((run_id, result['test'], subject, metric, value) for metric, value in metrics.items())
+            self.connection.executemany(
+                'INSERT INTO measurements (run_id, test, subject, metric, value) VALUES (?, ?, ?, ?, ?)', rows
+            )
+        return run_id
+
+    def trend(self, metric: str, test: Optional[str] = None, subject: Optional[str] = None,
+              config_key: Optional[str] = None) -> List[tuple]:
+        """Returns (timestamp, config key, release tag, package hash, host, test, subject, value) rows, oldest first"""
+        query = (
+            'SELECT r.timestamp, r.config_key, r.release_tag, r.package_hash, r.host_fingerprint, m.test, m.subject,'
+            ' m.value FROM measurements m JOIN runs r ON m.run_id = r.id WHERE m.metric = ?'
+        )
+        parameters = [metric]
+        for column, value in [('m.test', test), ('m.subject', subject), ('r.config_key', config_key)]:
+            if value is not None:
+                query += ' AND %s = ?' % column
+                parameters.append(value)
+        return self.connection.execute(query + ' ORDER BY r.timestamp', parameters).fetchall()
+
+    def regressions(self, significance: float = 0.01, min_relative_change: float = 0.05,
+                    min_segment: int = 3) -> List[dict]:
+        """Scans every timing and throughput series (per config, host, test, subject and metric) for a statistically
+        significant slowdown
+
+        Series are never mixed across hosts or configurations, since those differences would swamp real changes.  Only
+        metrics with a direction (see metric_direction) are scanned.
+        """
+        series: Dict[tuple, List[Tuple[float, str, float]]] = {}
+        for timestamp, config_key, release_tag, host, test, subject, metric, value in self.connection.execute(
+            'SELECT r.timestamp, r.config_key, r.release_tag, r.host_fingerprint, m.test, m.subject, m.metric, m.value'
+            ' FROM measurements m JOIN runs r ON m.run_id = r.id ORDER BY r.timestamp'
+        ):
+            series.setdefault((config_key, host, test, subject, metric), []).append((timestamp, release_tag, value))
+        found = []
+        for (config_key, host, test, subject, metric), points in series.items():
+            direction = metric_direction(metric)
+            if direction is None:
+                continue
+            change = detect_change_point([p[2] for p in points], min_segment)
+            if change is None or change['p_value'] >= significance:
+                continue
+            slowdown = -change['relative_change'] if direction else change['relative_change']
+            if slowdown < min_relative_change:
+                continue
+            change.update({
+                'config_key': config_key, 'host': host, 'test': test, 'subject': subject, 'metric': metric,
+                'slowdown': slowdown, 'first_slow_release': points[change['index']][1],
+                'first_slow_timestamp': points[change['index']][0],
+            })
+            found.append(change)
+        return sorted(found, key=lambda c: -c['slowdown'])
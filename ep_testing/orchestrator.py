@@ -0,0 +1,185 @@
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from ep_testing.downloader import Downloader
+from ep_testing.exceptions import EPTestingException
+from ep_testing.results import hash_install_root
+
+
+async def run_command(command_line: List[str], **kwargs) -> None:
+    """The asyncio counterpart of my_check_call: runs a command and raises with its output if it fails"""
+    p = await asyncio.create_subprocess_exec(
+        *command_line, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, **kwargs
+    )
+    stdout, stderr = await p.communicate()
+    if p.returncode != 0:
+        raise EPTestingException(
+            f'Command {command_line} failed with exit status {p.returncode}!\n'
+            'stderr:\n'
+            f'{stderr.decode().strip()}'
+            '\n\n'
+            'stdout:\n'
+            f'{stdout.decode().strip()}')
+
+
+class Step:
+    """A node in the run graph: an async action that starts as soon as all of its dependencies have finished"""
+
+    def __init__(self, name: str, action: Callable, depends_on: List[str]):
+        self.name = name
+        self.action = action
+        self.depends_on = depends_on
+        self.start: Optional[float] = None
+        self.end: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start if self.end is not None else 0.0
+
+
+class Orchestrator:
+    """Runs a dependency graph of async steps, overlapping everything that the dependencies allow"""
+
+    def __init__(self):
+        self.steps: Dict[str, Step] = {}
+        self.start: Optional[float] = None
+
+    def add_step(self, name: str, action: Callable, depends_on: Optional[List[str]] = None) -> None:
+        """Adds a step; action is an async callable taking no arguments"""
+        depends_on = depends_on or []
+        for dependency in depends_on:
+            if dependency not in self.steps:
+                raise EPTestingException('Step "%s" depends on unknown step "%s"' % (name, dependency))
+        self.steps[name] = Step(name, action, depends_on)
+
+    async def _run_step(self, step: Step, tasks: Dict[str, asyncio.Task]) -> None:
+        await asyncio.gather(*(tasks[dependency] for dependency in step.depends_on))
+        step.start = time.time()
+        await step.action()
+        step.end = time.time()
+        print('* Step "%s" finished in %.2fs at +%.2fs' % (step.name, step.duration, step.end - self.start))
+
+    async def _run_all(self) -> None:
+        tasks: Dict[str, asyncio.Task] = {}
+        for name, step in self.steps.items():  # dependencies are always added first, so they always exist here
+            tasks[name] = asyncio.ensure_future(self._run_step(step, tasks))
+        await asyncio.gather(*tasks.values())
+
+    def run(self) -> None:
+        self.start = time.time()
+        asyncio.run(self._run_all())
+
+    def critical_path(self) -> List[Step]:
+        """Walks back from the last step to finish, always through the dependency that finished last"""
+        finished = [s for s in self.steps.values() if s.end is not None]
+        if not finished:
+            return []
+        path = [max(finished, key=lambda s: s.end)]
+        while path[-1].depends_on:
+            path.append(max((self.steps[d] for d in path[-1].depends_on), key=lambda s: s.end))
+        return list(reversed(path))
+
+    def report(self) -> None:
+        print('Critical path (%.2fs total):' % (max(s.end for s in self.steps.values()) - self.start))
+        for step in self.critical_path():
+            print('    %-50s started +%7.2fs  took %7.2fs' % (step.name, step.start - self.start, step.duration))
+
+
+class OverlappedRun:
+    """Runs a Tester's selected tests as a graph that overlaps extracting the package with running the tests
+
+    After the fetch, the root level files are extracted (and hashed to identify the package), and each test gets its
+    own extract step for its package_paths, so a test starts as soon as the root files and its own paths have landed
+    instead of waiting for the whole package.  Tests change the working directory, so they still run one at a time in
+    the planned order, each also depending on the one before it, while extraction carries on around them.  Each goes
+    through Tester.run_one, so results, profiles and --rerun-failed work as in a sequential run.
+    """
+
+    def __init__(self, tester, run_config: str, download_dir: str, use_local: str = '', announce: callable = None):
+        self.tester = tester
+        self.run_config = run_config
+        self.download_dir = download_dir
+        self.use_local = use_local
+        self.announce = announce
+        self.downloader = None
+        self.install_root: Optional[str] = None
+        self.claimed_members: Dict[str, asyncio.Future] = {}  # archive member -> the extraction that claimed it
+        self.orchestrator = Orchestrator()
+        self._build_graph()
+
+    async def _in_thread(self, func: Callable, *args):
+        return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    def _fetch(self):
+        self.downloader = Downloader(self.tester.config, self.download_dir, use_local=self.use_local,
+                                     announce=self.announce, extract=False)
+        self.install_root = self.downloader.prepare_partial_extraction()
+
+    def _identify(self):
+        self.tester.install_path = self.install_root
+        self.tester.package_hash = hash_install_root(self.install_root)
+        self.tester.results_store.remember_install(
+            self.run_config, self.tester.config.tag_this_version, self.install_root, self.tester.package_hash
+        )
+        print('Package hash: %s' % self.tester.package_hash)
+
+    def _extract_action(self, paths: List[str], include_root_files: bool) -> Callable:
+        async def extract():
+            members = self.downloader.matching_members(paths, include_root_files)
+            claimed_elsewhere = set(self.claimed_members[m] for m in members if m in self.claimed_members)
+            mine = [m for m in members if m not in self.claimed_members]
+            extracted = asyncio.get_event_loop().create_future()
+            self.claimed_members.update((m, extracted) for m in mine)
+            try:
+                if mine:
+                    await run_command(self.downloader.extraction_command(mine), cwd=self.download_dir)
+                    self.downloader.extracted_members.update(mine)
+            except Exception as e:
+                extracted.set_exception(e)
+                raise
+            extracted.set_result(None)
+            # members shared with another test may still be landing from that test's extract step
+            await asyncio.gather(*claimed_elsewhere)
+        return extract
+
+    def _test_action(self, test_class: type, kwargs: dict) -> Callable:
+        async def run_test():
+            if not self.tester.passed_previously(test_class, kwargs):
+                self.tester.results.append(await self._in_thread(self.tester.run_one, test_class, kwargs))
+        return run_test
+
+    def _build_graph(self):
+        o = self.orchestrator
+
+        async def fetch():
+            await self._in_thread(self._fetch)
+
+        async def identify():
+            await self._in_thread(self._identify)
+
+        o.add_step('fetch', fetch)
+        o.add_step('extract:root', self._extract_action([], True), ['fetch'])
+        o.add_step('identify', identify, ['extract:root'])
+        # with --rerun-failed, whether a test runs at all depends on the package hash, so only extract after that
+        extract_after = ['identify'] if self.tester.rerun_failed else ['fetch']
+        previous_test = 'identify'
+        for index, (test_class, kwargs) in enumerate(self.tester.selected_tests()):
+            step_suffix = '%i:%s' % (index, test_class.__name__)
+            o.add_step('extract:' + step_suffix, self._extract_action(test_class.package_paths(kwargs), False),
+                       extract_after)
+            o.add_step('test:' + step_suffix, self._test_action(test_class, kwargs),
+                       [previous_test, 'extract:' + step_suffix])
+            previous_test = 'test:' + step_suffix
+
+    def run(self) -> List[dict]:
+        """Runs the graph and reports its critical path, returning the Tester results"""
+        saved_path = os.getcwd()
+        self.tester.results = []
+        try:
+            self.orchestrator.run()
+        finally:
+            os.chdir(saved_path)
+        self.orchestrator.report()
+        return self.tester.results
@@ -0,0 +1,55 @@
+"""A minimal stdlib sampling profiler, used on Python scripts when py-spy is not installed
+
+Usage: python profile_sampler.py <output.folded> <interval seconds> <script> [script args...]
+
+The script runs on the main thread while a background thread samples its stack every interval.  Only Python frames
+are visible, so time spent inside the E+ library is attributed to the Python call that entered it.  This file must
+stay standalone, it runs under whatever interpreter the profiled script uses.
+"""
+from collections import Counter
+import os
+import runpy
+import sys
+import threading
+
+
+def main() -> None:
+    output_path, interval, script = sys.argv[1], float(sys.argv[2]), sys.argv[3]
+    sys.argv = sys.argv[3:]
+    script_path = os.path.abspath(script)
+    sys.path[0] = os.path.dirname(script_path)
+    main_thread_id = threading.get_ident()
+    stacks = Counter()
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(interval):
+            frame = sys._current_frames().get(main_thread_id)
+            frames = []
+            while frame is not None:
+                frames.append(frame.f_code)
+                frame = frame.f_back
+            frames.reverse()
+            # drop this sampler and runpy from the root of the stack, and samples taken before the script started
+            script_frames = [i for i, code in enumerate(frames) if os.path.abspath(code.co_filename) == script_path]
+            if not script_frames:
+                continue
+            stacks[';'.join(
+                '%s (%s:%i)' % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+                for code in frames[script_frames[0]:]
+            )] += 1
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        runpy.run_path(script, run_name='__main__')
+    finally:
+        done.set()
+        sampler.join()
+        with open(output_path, 'w') as f:
+            for stack, count in sorted(stacks.items()):
+                f.write('%s %i\n' % (stack, count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Opt-in sampling profiler capture for the subprocesses a test launches
+
+While a session is active (the Tester starts one around each test selected with --profile or the EP_TESTING_PROFILE
+environment variable), every launch site passes its command line through `profiled`.  Native binaries are wrapped in
+`perf record -g` when perf is usable, and Python scripts in `py-spy record` when py-spy is usable, falling back to
+the stdlib sampler in profile_sampler.py.  When the session stops, every capture is collapsed into a flamegraph-ready
+folded stack file, one `frame;frame;frame count` line per unique stack.
+"""
+from collections import Counter
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+PROFILE_ENV_VAR = 'EP_TESTING_PROFILE'
+SAMPLE_INTERVAL = 0.005  # seconds between samples for the stdlib sampler, about the same rate as perf and py-spy
+
+_perf_usable: Optional[bool] = None
+_py_spy_usable: Optional[bool] = None
+_session: Optional['ProfileSession'] = None
+
+
+def tests_from_environment() -> List[str]:
+    """Returns the test class names listed (comma separated) in the EP_TESTING_PROFILE environment variable"""
+    return [name.strip() for name in os.environ.get(PROFILE_ENV_VAR, '').split(',') if name.strip()]
+
+
+def perf_usable() -> bool:
+    """Returns whether perf is installed and allowed to record here, which perf_event_paranoid often forbids"""
+    global _perf_usable
+    if _perf_usable is None:
+        _perf_usable = False
+        if shutil.which('perf') is not None:
+            r = subprocess.run(['perf', 'record', '-q', '-o', os.devnull, '--', 'true'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            _perf_usable = r.returncode == 0
+    return _perf_usable
+
+
+def py_spy_arguments(output_path: str) -> List[str]:
+    arguments = ['py-spy', 'record', '--format', 'raw', '--rate', '200', '--output', output_path]
+    if platform.system() == 'Linux':
+        arguments.append('--native')  # show where the time goes inside the E+ library too
+    return arguments
+
+
+def py_spy_usable() -> bool:
+    """Returns whether py-spy is installed and allowed to attach here, which ptrace restrictions often forbid"""
+    global _py_spy_usable
+    if _py_spy_usable is None:
+        _py_spy_usable = False
+        if shutil.which('py-spy') is not None:
+            handle, probe_output = tempfile.mkstemp(suffix='.folded')
+            os.close(handle)
+            r = subprocess.run(py_spy_arguments(probe_output) + ['--', sys.executable, '-c', 'pass'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            os.remove(probe_output)
+            _py_spy_usable = r.returncode == 0
+    return _py_spy_usable
+
+
+def is_python_command(command_line: List[str]) -> bool:
+    return command_line[0] == sys.executable or os.path.basename(command_line[0]).lower().startswith('python')
+
+
+def collapse_perf_script(perf_script_output: str) -> Dict[str, int]:
+    """Collapses `perf script` output into folded stacks, root frame first, keyed by the command name"""
+    stacks = Counter()
+    for block in perf_script_output.split('\n\n'):
+        lines = [line for line in block.splitlines() if line.strip()]
+        if not lines or lines[0].startswith('\t'):  # sample headers are space padded, frames tab indented
+            continue
+        frames = []
+        for line in lines[1:]:
+            parts = line.strip().split(None, 1)
+            if len(parts) < 2:
+                continue
+            symbol, _, dso = parts[1].rpartition(' (')
+            if symbol == '[unknown]':
+                symbol = '[%s]' % os.path.basename(dso.rstrip(')'))
+            frames.append(re.sub(r'\+0x[0-9a-f]+$', '', symbol))
+        stacks[';'.join([lines[0].split()[0]] + frames[::-1])] += 1
+    return stacks
+
+
+def write_folded(stacks: Dict[str, int], folded_path: str) -> None:
+    with open(folded_path, 'w') as f:
+        for stack, count in sorted(stacks.items()):
+            f.write('%s %i\n' % (stack, count))
+
+
+class ProfileSession:
+    """Wraps the commands launched during one test, and collapses the captures when the test is done"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._lock = threading.Lock()  # some tests launch their subprocesses from a thread pool
+        self._launched = 0
+        self._perf_captures: List[str] = []
+        self._folded_files: List[str] = []
+
+    def _capture_base(self, command_line: List[str]) -> str:
+        with self._lock:
+            self._launched += 1
+            index = self._launched
+        name = os.path.basename(command_line[1] if is_python_command(command_line) else command_line[0])
+        return os.path.join(self.output_dir, '%03i_%s' % (index, os.path.splitext(name)[0]))
+
+    def wrap(self, command_line: List[str]) -> List[str]:
+        if is_python_command(command_line):
+            folded_path = self._capture_base(command_line) + '.folded'
+            with self._lock:
+                self._folded_files.append(folded_path)
+            if py_spy_usable():
+                return py_spy_arguments(folded_path) + ['--'] + command_line
+            sampler = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'profile_sampler.py')
+            return [command_line[0], sampler, folded_path, str(SAMPLE_INTERVAL)] + command_line[1:]
+        if not perf_usable():
+            return command_line
+        perf_data = self._capture_base(command_line) + '.perf.data'
+        with self._lock:
+            self._perf_captures.append(perf_data)
+        return ['perf', 'record', '-q', '-g', '-o', perf_data, '--'] + command_line
+
+    def finish(self) -> List[str]:
+        """Collapses the perf captures, returning the paths of all the folded stack files that were written"""
+        for perf_data in self._perf_captures:
+            if not os.path.exists(perf_data):
+                continue
+            r = subprocess.run(['perf', 'script', '-i', perf_data], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            folded_path = perf_data[:-len('.perf.data')] + '.folded'
+            write_folded(collapse_perf_script(r.stdout.decode(errors='replace')), folded_path)
+            self._folded_files.append(folded_path)
+        return sorted(f for f in self._folded_files if os.path.exists(f))
+
+
+def start(output_dir: str) -> None:
+    global _session
+    _session = ProfileSession(output_dir)
+
+
+def stop() -> List[str]:
+    """Ends the active session, returning the folded stack files it produced"""
+    global _session
+    if _session is None:
+        return []
+    session, _session = _session, None
+    return session.finish()
+
+
+def profiled(command_line: List[str]) -> List[str]:
+    """Returns the command line to launch, wrapped in a profiler if a session is active"""
+    if _session is None:
+        return command_line
+    return _session.wrap(command_line)
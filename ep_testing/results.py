@@ -0,0 +1,163 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Callable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows, see ResultsStore._locked
+    fcntl = None
+    import msvcrt
+
+from ep_testing.exceptions import EPTestingException
+
+DEFAULT_RESULTS_STORE = os.path.join(os.path.expanduser('~'), '.ep_testing', 'results.json')
+KEPT_PACKAGES = 20  # results are only kept for this many of the most recently tested package hashes
+
+
+def hash_install_root(install_root: str) -> str:
+    """Hashes the files that identify an EnergyPlus package: the IDD, the energyplus binary and the API library
+
+    Only these root level files are used because several tests write their outputs into the install tree, so hashing
+    everything would give a different answer after every run.
+    """
+    identity_files = sorted(
+        f.name for f in os.scandir(install_root) if f.is_file() and (
+            f.name == 'Energy+.idd' or f.name.startswith('energyplus') or f.name.startswith('libenergyplus')
+        )
+    )
+    if not identity_files:
+        raise EPTestingException('Could not find any package identity files in %s' % install_root)
+    h = hashlib.sha256()
+    for file_name in identity_files:
+        h.update(file_name.encode())
+        with open(os.path.join(install_root, file_name), 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultsStore:
+    """A persistent JSON store of test outcomes keyed on package hash, test name and test inputs
+
+    It also remembers where the last package for a given run configuration and release tag was extracted, so that
+    reruns against the identical package can skip the download and extraction entirely.  Several runs can share one
+    store: every change is made under a file lock on top of what is on disk at that moment, and only the results of
+    the KEPT_PACKAGES most recently tested packages are kept.
+    """
+
+    def __init__(self, store_path: str = DEFAULT_RESULTS_STORE):
+        self.path = store_path
+        self.data = self._read()
+
+    def _read(self) -> dict:
+        if not os.path.exists(self.path):
+            return {'packages': {}, 'results': {}}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise EPTestingException('Could not read results store at %s; error: %s' % (self.path, str(e)))
+
+    @contextmanager
+    def _locked(self):
+        store_dir = os.path.dirname(self.path)
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+        with open(self.path + '.lock', 'a+') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)  # retries for 10 seconds, then raises
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _update(self, change: Callable[[dict], None]) -> None:
+        """Applies a change to the latest contents of the store and writes it back, all under the lock"""
+        with self._locked():
+            self.data = self._read()
+            change(self.data)
+            self._prune()
+            self.save()
+
+    def _prune(self) -> None:
+        """Drops the results (and profiles) of all but the most recently tested or still remembered packages"""
+        remembered = set(entry['package_hash'] for entry in self.data['packages'].values())
+        last_tested = {
+            package_hash: max((r['timestamp'] for r in results.values()), default=0.0)
+            for package_hash, results in self.data['results'].items()
+        }
+        kept = set(sorted(last_tested, key=last_tested.get, reverse=True)[:KEPT_PACKAGES]) | remembered
+        for package_hash in set(last_tested) - kept:
+            del self.data['results'][package_hash]
+            shutil.rmtree(os.path.join(os.path.dirname(self.path), 'profiles', package_hash), ignore_errors=True)
+
+    @staticmethod
+    def test_key(test_name: str, kwargs: dict) -> str:
+        return test_name + ':' + json.dumps(kwargs, sort_keys=True, default=str)
+
+    def remembered_install(self, run_config: str, release_tag: str) -> Optional[str]:
+        entry = self.data['packages'].get('%s:%s' % (run_config, release_tag))
+        if entry is None or not os.path.isdir(entry['install_path']):
+            return None
+        return entry['install_path']
+
+    def remember_install(self, run_config: str, release_tag: str, install_path: str, package_hash: str) -> None:
+        def change(data: dict) -> None:
+            data['packages']['%s:%s' % (run_config, release_tag)] = {
+                'install_path': install_path, 'package_hash': package_hash
+            }
+        self._update(change)
+
+    def lookup(self, package_hash: str, test_name: str, kwargs: dict) -> Optional[dict]:
+        return self.data['results'].get(package_hash, {}).get(self.test_key(test_name, kwargs))
+
+    def passed_previously(self, package_hash: str, test_name: str, kwargs: dict) -> bool:
+        result = self.lookup(package_hash, test_name, kwargs)
+        return result is not None and result['passed']
+
+    def record(self, package_hash: str, test_name: str, kwargs: dict, passed: bool, duration: float,
+               message: str = '', measurements: Optional[dict] = None,
+               profiles: Optional[List[str]] = None, profiled: bool = False) -> dict:
+        result = {
+            'test': test_name,
+            'kwargs': json.loads(json.dumps(kwargs, default=str)),
+            'passed': passed,
+            'duration': duration,
+            'timestamp': time.time(),
+            'message': message,
+            'measurements': measurements or {},
+            'profiles': profiles or [],
+            'profiled': profiled,  # timings of profiled runs are inflated by the profiler
+        }
+
+        def change(data: dict) -> None:
+            data['results'].setdefault(package_hash, {})[self.test_key(test_name, kwargs)] = result
+        self._update(change)
+        return result
+
+    def profile_dir(self, package_hash: str, test_name: str) -> str:
+        """Returns a new directory for the profiles captured during one run of a test, next to the store itself"""
+        return os.path.join(
+            os.path.dirname(self.path), 'profiles', package_hash, test_name, time.strftime('%Y%m%d-%H%M%S')
+        )
+
+    def save(self) -> None:
+        """Writes the store as it is in memory, callers that change it should go through _update instead"""
+        store_dir = os.path.dirname(self.path)
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,107 @@
+from distutils import log
+import os
+from tempfile import mkdtemp
+from typing import List, Optional, Tuple
+
+from ep_testing.config import TestConfiguration
+from ep_testing.downloader import Downloader, missing_package_paths
+from ep_testing.history import DEFAULT_HISTORY_DATABASE, HistoryDatabase
+from ep_testing.exceptions import EPTestingException
+from ep_testing.orchestrator import OverlappedRun
+from ep_testing.results import DEFAULT_RESULTS_STORE, ResultsStore, hash_install_root
+from ep_testing.tester import Tester
+
+
+def _my_print(announce: callable, message: str, level: object = log.INFO) -> None:
+    if announce:
+        announce(message, level)
+    else:
+        print(message)
+
+
+def run_tests(run_config: str, msvc_version: Optional[int] = None, use_local_copy: Optional[str] = None,
+              verbose: bool = False, results_store: Optional[str] = None, rerun_failed: bool = False,
+              only: Optional[List[str]] = None, full_extract: bool = False, workload: str = 'sanity',
+              overlapped: bool = False, tests: Optional[List[Tuple[type, dict]]] = None,
+              history_database: Optional[str] = None, profile: Optional[List[str]] = None,
+              announce: callable = None) -> List[dict]:
+    """Gets hold of a package for run_config, then runs a workload (or an explicit list of tests) against it
+
+    This is the body of both `setup.py run` and `ep-testing test`, see those for a description of the options.  The
+    package comes from use_local_copy if given (either an archive or an already extracted directory), otherwise from
+    the previously extracted package when only rerunning, otherwise it is downloaded.  With overlapped, the package
+    is always fetched (or copied from a local archive) and extracted test by test while the tests run, see
+    OverlappedRun.  Every run, passing or not, is also recorded in the history database.  Returns the Tester results.
+    """
+    c = TestConfiguration(run_config, msvc_version)
+    _my_print(announce, 'Attempting to test tag name: %s' % c.tag_this_version)
+    store = ResultsStore(results_store or DEFAULT_RESULTS_STORE)
+    if overlapped:
+        if full_extract:
+            raise EPTestingException('The overlapped run extracts each test separately, it cannot use --full-extract')
+        if use_local_copy is not None and not os.path.isfile(use_local_copy):
+            raise EPTestingException(
+                'The overlapped run only works with a downloaded or local archive, not a directory: %s' % use_local_copy
+            )
+        t = Tester(c, '', verbose, results_store=store, only=only, rerun_failed=rerun_failed, workload=workload,
+                   tests=tests, profile=profile)
+        overlapped_run = OverlappedRun(t, run_config, mkdtemp(), use_local=use_local_copy or '', announce=announce)
+        return _run_and_record(t, run_config, c.tag_this_version, history_database, overlapped_run.run)
+    required_paths = None
+    if not full_extract:
+        required_paths = Tester(c, '', verbose, only=only, workload=workload, tests=tests).required_package_paths()
+    extractor = None
+    download_dir: str = mkdtemp()
+    local_copy = use_local_copy
+    if local_copy is None and (rerun_failed or only):
+        local_copy = store.remembered_install(run_config, c.tag_this_version)
+        if local_copy is not None and required_paths and missing_package_paths(local_copy, required_paths):
+            # the remembered package was only partially extracted for a different set of tests
+            local_copy = None
+        if local_copy is not None:
+            _my_print(announce, f'Reusing previously extracted package at: {local_copy}')
+    if local_copy is None:
+        d = Downloader(c, download_dir, announce=announce, required_paths=required_paths)
+        extractor = d
+        local_copy = d.extracted_install_path
+        _my_print(announce, f'EnergyPlus package extracted to: {local_copy}')
+    else:
+        if os.path.isdir(local_copy):
+            # in this case local copy is already an extracted dir, no need to do anything, just test
+            _my_print(announce, f'Using local EnergyPlus package extracted at: {local_copy}')
+        elif os.path.isfile(local_copy):
+            _my_print(announce, f'Using local EnergyPlus archive at {local_copy}')
+            # this call will skip downloading, but it will extract it to a new directory
+            d = Downloader(c, download_dir, use_local=local_copy, announce=announce, required_paths=required_paths)
+            extractor = d
+            local_copy = d.extracted_install_path
+        else:
+            _my_print(announce, f'Trying to use local copy at {local_copy}, but it does not exist!  Aborting...')
+            return []
+    package_hash = hash_install_root(local_copy)
+    store.remember_install(run_config, c.tag_this_version, local_copy, package_hash)
+    _my_print(announce, f'Package hash: {package_hash}')
+    t = Tester(c, local_copy, verbose, results_store=store, package_hash=package_hash, only=only,
+               rerun_failed=rerun_failed, extractor=extractor, workload=workload, tests=tests, profile=profile)
+    return _run_and_record(t, run_config, c.tag_this_version, history_database, t.run)
+
+
+def _run_and_record(t: Tester, run_config: str, release_tag: str, history_database: Optional[str],
+                    run: callable) -> List[dict]:
+    """Calls run, then records the outcome and the Tester results in the history database, passing or not"""
+    status, message = 'failed', 'interrupted'
+    try:
+        # unhandled exceptions should cause this to fail
+        results = run()
+        status, message = 'passed', ''
+        return results
+    except Exception as e:
+        message = str(e)
+        raise
+    finally:
+        # every run is recorded, a failing one with the results of the tests that completed before it failed, unless
+        # it failed before the package could even be identified (which only the overlapped run can)
+        if t.package_hash is not None:
+            HistoryDatabase(history_database or DEFAULT_HISTORY_DATABASE).record_run(
+                run_config, release_tag, t.package_hash, t.results, status, message
+            )
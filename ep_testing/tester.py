@@ -1,55 +1,216 @@
 import os
+import shutil
+import time
+from tempfile import mkdtemp
+from typing import List, Optional, Tuple
 
-from ep_testing.config import TestConfiguration, OS
-from ep_testing.tests.api import TestPythonAPIAccess, TestCAPIAccess, TestCppAPIDelayedAccess
+try:
+    import resource
+except ImportError:  # not available on Windows, where resource usage just isn't reported
+    resource = None
+
+from ep_testing.config import TestConfiguration, OS, WORKLOADS
+from ep_testing.exceptions import EPTestingException
+from ep_testing import profiling
+from ep_testing.results import ResultsStore
+from ep_testing.tests.annual import TestAnnualWeatherRun
+from ep_testing.tests.api import (
+    TestPythonAPIAccess, TestCAPIAccess, TestCAPIRuntimeCallbackOverhead, TestCppAPIDelayedAccess
+)
+from ep_testing.tests.documentation import TestVersionInfoInAllDocumentation
 from ep_testing.tests.energyplus import TestPlainDDRunEPlusFile
 from ep_testing.tests.expand_objects import TestExpandObjectsAndRun
 from ep_testing.tests.hvacdiagram import HVACDiagram
+from ep_testing.tests.postprocess import TestPostProcessPipeline
+from ep_testing.tests.python_plugin import TestPythonPluginOverhead
+from ep_testing.tests.scaling import TestConcurrencyScaling
 from ep_testing.tests.transition import TransitionOldFile
 
+# example files simulated for their full run periods by the annual workload, paired with a matching weather file
+ANNUAL_WORKLOAD_FILES = [
+    {'test_file': '1ZoneUncontrolled.idf', 'weather_file': 'USA_CO_Golden-NREL.724666_TMY3.epw'},
+    {'test_file': '5ZoneAirCooled.idf', 'weather_file': 'USA_IL_Chicago-OHare.Intl.AP.725300_TMY3.epw'},
+]
+
+# example files simulated by the pipeline workload, with their outputs post-processed by a separate worker pool
+PIPELINE_WORKLOAD = {
+    'test_files': ['1ZoneUncontrolled.idf', '5ZoneAirCooled.idf', '1ZoneEvapCooler.idf', '5ZoneAutoDXVAV.idf'],
+    'simulation_workers': 2,
+    'post_process_workers': 2,
+}
+
+# example files batched by the scaling workload, run at concurrency 1, 2, 4, ... up to the core count
+SCALING_WORKLOAD = {
+    'test_files': ['1ZoneUncontrolled.idf', '5ZoneAirCooled.idf'],
+}
+
+
+def child_resource_usage() -> dict:
+    """Returns the CPU time used so far by finished child processes, where the platform reports it
+
+    Peak memory is deliberately left out: ru_maxrss is a high water mark over every child so far, so it would describe
+    whichever earlier test peaked highest rather than the current one, and its units differ between Linux and macOS.
+    """
+    if resource is None:
+        return {}
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {'user_cpu_time': usage.ru_utime, 'system_cpu_time': usage.ru_stime}
+
 
 class Tester:
 
-    def __init__(self, config: TestConfiguration, install_path: str, verbose: bool):
+    def __init__(self, config: TestConfiguration, install_path: str, verbose: bool,
+                 results_store: Optional[ResultsStore] = None, package_hash: Optional[str] = None,
+                 only: Optional[List[str]] = None, rerun_failed: bool = False, extractor=None,
+                 workload: str = 'sanity', tests: Optional[List[Tuple[type, dict]]] = None,
+                 profile: Optional[List[str]] = None):
         self.install_path = install_path
         self.config = config
         self.verbose = verbose
+        self.results_store = results_store
+        self.package_hash = package_hash
+        self.only = only
+        self.rerun_failed = rerun_failed
+        self.extractor = extractor  # a Downloader, if the package was only partially extracted
+        if workload not in WORKLOADS:
+            raise EPTestingException('Unknown workload "%s", options are: %s' % (workload, ', '.join(WORKLOADS)))
+        self.workload = workload
+        self.tests = tests  # an explicit list of (test class, kwargs) pairs overrides the workload
+        self.results: List[dict] = []  # filled in as tests finish, so the completed ones survive a failing run
+        # names of the tests whose subprocesses run under a sampling profiler, see profiling.py
+        self.profile = profile if profile is not None else profiling.tests_from_environment()
+        self.profile_from_environment = profile is None  # only an explicit --profile insists the tests exist
+        # the package hash can be filled in later, the overlapped run only knows it once the package is extracted
+        if self.rerun_failed and self.results_store is None:
+            raise EPTestingException('Rerunning failed tests requires a results store')
 
-    def run(self):
-        saved_path = os.getcwd()
-        TestPlainDDRunEPlusFile().run(
-            self.install_path, self.verbose, {'test_file': '1ZoneUncontrolled.idf'}
-        )
-        TestPlainDDRunEPlusFile().run(
-            self.install_path, self.verbose, {'test_file': 'PythonPluginCustomOutputVariable.idf'}
-        )
-        TestExpandObjectsAndRun().run(
-            self.install_path, self.verbose, {'test_file': 'HVACTemplate-5ZoneFanCoil.idf'}
-        )
-        TransitionOldFile().run(
-            self.install_path, self.verbose, {'last_version': self.config.tag_last_version}
-        )
-        HVACDiagram().run(
-            self.install_path, self.verbose, {}
-        )
+    def planned_tests(self, quiet: bool = False) -> List[Tuple[type, dict]]:
+        """Returns the (test class, kwargs) pairs that make up a full run of the workload on this configuration"""
+        if self.tests is not None:
+            return list(self.tests)
+        if self.workload == 'documentation':
+            if shutil.which('pdftotext') is None:
+                raise EPTestingException('The documentation workload needs pdftotext, which is not on the PATH')
+            return [(TestVersionInfoInAllDocumentation, {'version_string': self.config.this_version})]
+        if self.workload == 'annual':
+            return [(TestAnnualWeatherRun, dict(kwargs)) for kwargs in ANNUAL_WORKLOAD_FILES]
+        if self.workload == 'pipeline':
+            return [(TestPostProcessPipeline, dict(PIPELINE_WORKLOAD))]
+        if self.workload == 'scaling':
+            return [(TestConcurrencyScaling, dict(SCALING_WORKLOAD))]
+        if self.workload == 'plugins':
+            return [(TestPythonPluginOverhead, {
+                'os': self.config.os, 'test_file': 'PythonPluginCustomOutputVariable.idf', 'repeats': 3
+            })]
+        api_kwargs = {'os': self.config.os, 'bitness': self.config.bitness, 'msvc_version': self.config.msvc_version}
+        if self.workload == 'callbacks':
+            return [(TestCAPIRuntimeCallbackOverhead, dict(api_kwargs, test_file='5ZoneAirCooled.idf', repeats=3))]
+        tests = [
+            (TestPlainDDRunEPlusFile, {'test_file': '1ZoneUncontrolled.idf'}),
+            (TestPlainDDRunEPlusFile, {'test_file': 'PythonPluginCustomOutputVariable.idf'}),
+            (TestExpandObjectsAndRun, {'test_file': 'HVACTemplate-5ZoneFanCoil.idf'}),
+            (TransitionOldFile, {'last_version': self.config.tag_last_version}),
+            (HVACDiagram, {}),
+        ]
         if self.config.os == OS.Windows:
-            print("Windows Symlink runs are not testable on Travis, I think the user needs symlink privilege.")
+            if not quiet:
+                print("Windows Symlink runs are not testable on Travis, I think the user needs symlink privilege.")
         else:
-            TestPlainDDRunEPlusFile().run(
-                self.install_path, self.verbose, {'test_file': '1ZoneUncontrolled.idf', 'binary_sym_link': True}
-            )
-        TestCAPIAccess().run(
-            self.install_path, self.verbose,
-            {'os': self.config.os, 'bitness': self.config.bitness, 'msvc_version': self.config.msvc_version}
-        )
-        TestCppAPIDelayedAccess().run(
-            self.install_path, self.verbose,
-            {'os': self.config.os, 'bitness': self.config.bitness, 'msvc_version': self.config.msvc_version}
-        )
+            tests.append((TestPlainDDRunEPlusFile, {'test_file': '1ZoneUncontrolled.idf', 'binary_sym_link': True}))
+        tests.append((TestCAPIAccess, api_kwargs))
+        tests.append((TestCppAPIDelayedAccess, api_kwargs))
         if self.config.bitness == 'x32':
-            print("Travis does not have a 32-bit Python package readily available, so not testing Python API")
+            if not quiet:
+                print("Travis does not have a 32-bit Python package readily available, so not testing Python API")
         else:
-            TestPythonAPIAccess().run(
-                self.install_path, self.verbose, {'os': self.config.os}
-            )
+            tests.append((TestPythonAPIAccess, {'os': self.config.os}))
+        return tests
+
+    def required_package_paths(self) -> List[str]:
+        """Returns the union of the package paths needed by the tests that this tester will run"""
+        paths = set()
+        for test_class, kwargs in self.planned_tests(quiet=True):
+            if self.only and test_class.__name__ not in self.only:
+                continue
+            paths.update(test_class.package_paths(kwargs))
+        return sorted(paths)
+
+    def selected_tests(self) -> List[Tuple[type, dict]]:
+        """Returns the planned tests that --only selects, after checking the names passed to --only and --profile"""
+        planned_tests = self.planned_tests()
+        planned_names = set(test_class.__name__ for test_class, _ in planned_tests)
+        if self.only:
+            unknown_names = set(self.only) - planned_names
+            if unknown_names:
+                raise EPTestingException('Unknown test names passed to --only: %s' % ', '.join(sorted(unknown_names)))
+        unknown_names = set(self.profile) - planned_names
+        if unknown_names and not self.profile_from_environment:
+            raise EPTestingException('Unknown test names passed to --profile: %s' % ', '.join(sorted(unknown_names)))
+        elif unknown_names:
+            print('* Not profiling %s, not part of this run (from %s)' % (
+                ', '.join(sorted(unknown_names)), profiling.PROFILE_ENV_VAR
+            ))
+        return [(test_class, kwargs) for test_class, kwargs in planned_tests
+                if not self.only or test_class.__name__ in self.only]
+
+    def passed_previously(self, test_class: type, kwargs: dict) -> bool:
+        """Returns whether --rerun-failed skips this test because it already passed on this package"""
+        test_name = test_class.__name__
+        if self.rerun_failed and self.results_store.passed_previously(self.package_hash, test_name, kwargs):
+            print('* Skipping test class "%s"... [PASSED PREVIOUSLY ON THIS PACKAGE]' % test_name)
+            return True
+        return False
+
+    def run(self) -> List[dict]:
+        """Runs the selected tests, returning the name, kwargs, duration, resources and measurements of each that ran"""
+        saved_path = os.getcwd()
+        self.results = []
+        for test_class, kwargs in self.selected_tests():
+            if not self.passed_previously(test_class, kwargs):
+                self.results.append(self.run_one(test_class, kwargs))
         os.chdir(saved_path)
+        return self.results
+
+    def run_one(self, test_class: type, kwargs: dict) -> dict:
+        """Runs a single test, recording its outcome in the results store, and returns its result"""
+        test_name = test_class.__name__
+        if self.extractor is not None:
+            self.extractor.ensure_extracted(test_class.package_paths(kwargs))
+        profiling_this_test = test_name in self.profile
+        if profiling_this_test:
+            if self.results_store is not None and self.package_hash is not None:
+                profiling.start(self.results_store.profile_dir(self.package_hash, test_name))
+            else:
+                profiling.start(mkdtemp(prefix='profiles_%s_' % test_name))
+        start = time.time()
+        usage_before = child_resource_usage()
+        try:
+            measurements = test_class().run(self.install_path, self.verbose, kwargs)
+        except Exception as e:
+            duration = time.time() - start
+            profiles = profiling.stop() if profiling_this_test else []
+            if self.results_store is not None and self.package_hash is not None:
+                self.results_store.record(
+                    self.package_hash, test_name, kwargs, False, duration, str(e), profiles=profiles,
+                    profiled=profiling_this_test
+                )
+            raise
+        duration = time.time() - start  # before collapsing any profiles, which can take a while
+        usage_after = child_resource_usage()
+        profiles = profiling.stop() if profiling_this_test else []
+        if profiles:
+            print('    %i profile(s) written to %s' % (len(profiles), os.path.dirname(profiles[0])))
+        elif profiling_this_test:
+            print('    no profiles captured, is perf usable here and did the test launch any subprocesses?')
+        resources = {
+            k: usage_after[k] - usage_before[k] for k in ['user_cpu_time', 'system_cpu_time'] if k in usage_after
+        }
+        if self.results_store is not None and self.package_hash is not None:
+            self.results_store.record(
+                self.package_hash, test_name, kwargs, True, duration, measurements=measurements, profiles=profiles,
+                profiled=profiling_this_test
+            )
+        return {
+            'test': test_name, 'kwargs': kwargs, 'duration': duration, 'resources': resources,
+            'measurements': measurements or {}, 'profiles': profiles, 'profiled': profiling_this_test,
+        }
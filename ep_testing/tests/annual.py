@@ -0,0 +1,203 @@
+import os
+import re
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import pty
+except ImportError:  # Windows
+    pty = None
+
+from ep_testing.exceptions import EPTestingException
+from ep_testing.profiling import profiled
+from ep_testing.tests.base import BaseTest
+
+ELAPSED_TIME_PATTERN = re.compile(r'Elapsed Time=(\d+)hr\s+(\d+)min\s+([\d.]+)sec')
+EXIT_CLUSTER_SECONDS = 0.05  # console lines arriving this close to exit were most likely held back in a buffer
+
+
+def timestamped_console_lines(command_line: List[str],
+                              cwd: Optional[str] = None) -> Tuple[int, List[Tuple[float, str]], float]:
+    """Runs a command, returning its exit status, its console lines with the seconds after launch each arrived, and
+    the total wall time in seconds
+
+    E+ writes its console through C stdio, which only flushes every line when stdout is a terminal, so on POSIX the
+    command runs under a pseudo-terminal.  Elsewhere it falls back to a pipe, where the lines mostly arrive in blocks
+    and at exit, which `arrived_at_exit` detects.
+    """
+    timed_lines = []
+    start = time.perf_counter()
+    if pty is None:
+        p = subprocess.Popen(command_line, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
+                             cwd=cwd)
+        for line in p.stdout:
+            timed_lines.append((time.perf_counter() - start, line))
+        p.wait()
+        return p.returncode, timed_lines, time.perf_counter() - start
+    parent_fd, child_fd = pty.openpty()
+    p = subprocess.Popen(command_line, stdin=subprocess.DEVNULL, stdout=child_fd, stderr=child_fd, cwd=cwd)
+    os.close(child_fd)
+    pending = b''
+    while True:
+        try:
+            chunk = os.read(parent_fd, 4096)
+        except OSError:  # Linux reports EIO once the child side is closed
+            break
+        if not chunk:
+            break
+        pending += chunk
+        *lines, pending = pending.split(b'\n')
+        arrived = time.perf_counter() - start
+        timed_lines.extend((arrived, line.decode(errors='replace').rstrip('\r') + '\n') for line in lines)
+    os.close(parent_fd)
+    p.wait()
+    wall_seconds = time.perf_counter() - start
+    if pending:
+        timed_lines.append((wall_seconds, pending.decode(errors='replace')))
+    return p.returncode, timed_lines, wall_seconds
+
+
+def arrived_at_exit(arrival_times: List[float], wall_seconds: float) -> bool:
+    """Returns whether all the given console timestamps fall right at process exit, so they say nothing about when
+    the lines were printed"""
+    return all(wall_seconds - arrival < EXIT_CLUSTER_SECONDS for arrival in arrival_times)
+
+
+def parse_end_file(end_file_path: str) -> Tuple[bool, Optional[float]]:
+    """Returns whether eplusout.end reports success, and the elapsed time it reports in seconds, if any"""
+    if not os.path.exists(end_file_path):
+        return False, None
+    with open(end_file_path, errors='replace') as f:
+        contents = f.read()
+    success = 'EnergyPlus Completed Successfully' in contents
+    match = ELAPSED_TIME_PATTERN.search(contents)
+    if match is None:
+        return success, None
+    hours, minutes, seconds = match.groups()
+    return success, int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def parse_err_file(err_file_path: str) -> Dict[str, int]:
+    """Counts the warnings and severe errors reported in eplusout.err"""
+    counts = {'warnings': 0, 'severe_errors': 0}
+    if not os.path.exists(err_file_path):
+        return counts
+    with open(err_file_path, errors='replace') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith('** Warning **'):
+                counts['warnings'] += 1
+            elif stripped.startswith('** Severe  **') or stripped.startswith('**  Fatal  **'):
+                counts['severe_errors'] += 1
+    return counts
+
+
+def parse_eio_environments(eio_file_path: str) -> List[Tuple[str, str, int]]:
+    """Returns the (name, type, duration in days) of each environment reported in eplusout.eio"""
+    environments = []
+    if not os.path.exists(eio_file_path):
+        return environments
+    with open(eio_file_path, errors='replace') as f:
+        for line in f:
+            if not line.startswith('Environment,'):
+                continue
+            tokens = [t.strip() for t in line.split(',')]
+            if len(tokens) < 7:
+                continue
+            try:
+                duration = int(tokens[6])
+            except ValueError:
+                duration = 1
+            environments.append((tokens[1], tokens[2], duration))
+    return environments
+
+
+def is_run_period(environment_type: str) -> bool:
+    return 'RunPeriod' in environment_type and not environment_type.startswith('SizingPeriod')
+
+
+class TestAnnualWeatherRun(BaseTest):
+    """Runs an example file for its full weather file run periods and reports simulated hours per wall-clock second
+
+    Per-phase timing is taken by timestamping the progress lines E+ prints to the console as each phase begins, so
+    phase boundaries are approximate; the total elapsed time is the one E+ writes to eplusout.end.  When the console
+    lines were buffered until exit the phase times are left out rather than reported as zero.
+    """
+
+    def name(self):
+        return 'Test running an IDF for its full run periods against a weather file and report throughput'
+
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        return ['ExampleFiles/' + kwargs['test_file'], 'WeatherData/' + kwargs['weather_file']]
+
+    @staticmethod
+    def _phase_for_line(line: str) -> Optional[str]:
+        if line.startswith('Performing Zone Sizing') or line.startswith('Calculating System sizing'):
+            return 'sizing'
+        if line.startswith('Warming up'):
+            return 'warmup'
+        if line.startswith('Starting Simulation at'):
+            return 'environment:' + line.split(' for ', 1)[-1].strip()
+        if line.startswith('Writing tabular output') or line.startswith('Writing final SQL'):
+            return 'reporting'
+        return None
+
+    def run(self, install_root: str, verbose: bool, kwargs: dict):
+        if 'test_file' not in kwargs:
+            raise EPTestingException('Bad call to %s -- must pass test_file in kwargs' % self.__class__.__name__)
+        if 'weather_file' not in kwargs:
+            raise EPTestingException('Bad call to %s -- must pass weather_file in kwargs' % self.__class__.__name__)
+        test_file = kwargs['test_file']
+        weather_file = kwargs['weather_file']
+        print('* Running test class "%s" on file "%s"... ' % (self.__class__.__name__, test_file), end='')
+        eplus_binary = os.path.join(install_root, 'energyplus')
+        idf_path = os.path.join(install_root, 'ExampleFiles', test_file)
+        weather_path = os.path.join(install_root, 'WeatherData', weather_file)
+        output_dir = os.getcwd()
+        cmd = [eplus_binary, '-w', weather_path, '-d', output_dir, idf_path]
+        return_code, timed_lines, wall_time = timestamped_console_lines(profiled(cmd))
+        phase_starts = [('initialization', 0.0)]
+        for arrived, line in timed_lines:
+            phase = self._phase_for_line(line.strip())
+            if phase is not None and phase != phase_starts[-1][0]:
+                phase_starts.append((phase, arrived))
+        success, elapsed_time = parse_end_file(os.path.join(output_dir, 'eplusout.end'))
+        if return_code != 0 or not success:
+            raise EPTestingException(
+                'EnergyPlus failed!\n'
+                f'Command {cmd} failed with exit status {return_code}!\n'
+                'output:\n'
+                f'{"".join(line for _, line in timed_lines).strip()}')
+
+        # collapse the per-environment phases into design days and run periods using the environment types
+        environments = parse_eio_environments(os.path.join(output_dir, 'eplusout.eio'))
+        environment_types = {name.upper(): env_type for name, env_type, _ in environments}
+        phase_times = {}
+        boundaries = phase_starts + [('end', wall_time)]
+        for (phase, phase_start), (_, phase_end) in zip(boundaries[:-1], boundaries[1:]):
+            if phase.startswith('environment:'):
+                env_type = environment_types.get(phase.split(':', 1)[1].upper(), '')
+                phase = 'run_period' if is_run_period(env_type) else 'design_day'
+            phase_times[phase] = phase_times.get(phase, 0.0) + phase_end - phase_start
+        simulated_hours = 24 * sum(days for _, env_type, days in environments if is_run_period(env_type))
+        if simulated_hours == 0:
+            raise EPTestingException('No weather file run periods were simulated for %s' % test_file)
+        measurements = {
+            'wall_time': wall_time,
+            'elapsed_time': elapsed_time,
+            'simulated_hours': simulated_hours,
+            'simulated_hours_per_second': simulated_hours / wall_time,
+        }
+        if arrived_at_exit([phase_start for _, phase_start in phase_starts[1:]], wall_time):
+            print(' [NO PHASE TIMES, CONSOLE OUTPUT ONLY ARRIVED AT EXIT] ', end='')
+            phase_times = {}
+        else:
+            measurements['phase_times'] = phase_times
+        measurements.update(parse_err_file(os.path.join(output_dir, 'eplusout.err')))
+        print(' [%.1f SIMULATED HOURS/SEC] [DONE]!' % measurements['simulated_hours_per_second'])
+        if verbose:
+            for phase, phase_time in phase_times.items():
+                print('    %-15s %8.2f s' % (phase, phase_time))
+        return measurements
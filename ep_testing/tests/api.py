@@ -7,6 +7,7 @@ from typing import List
 
 from ep_testing.config import OS
 from ep_testing.exceptions import EPTestingException
+from ep_testing.profiling import profiled
 from ep_testing.tests.base import BaseTest
 
 
@@ -17,9 +18,13 @@ def api_resource_dir() -> str:
     return templates_dir
 
 
-def my_check_call(verbose: bool, command_line: List[str], **kwargs) -> None:
+def my_check_call(verbose: bool, command_line: List[str], profile: bool = True, **kwargs) -> str:
+    """Runs a command, raising with its output if it fails, and returns its stdout
 
-    r = subprocess.run(command_line,
+    Pass profile=False for build steps, which should never run under the profiler even when the test is profiled.
+    """
+
+    r = subprocess.run(profiled(command_line) if profile else command_line,
                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
     if r.returncode != 0:
         raise EPTestingException(
@@ -31,6 +36,7 @@ def my_check_call(verbose: bool, command_line: List[str], **kwargs) -> None:
             f'{r.stdout.decode().strip()}')
     elif verbose:
         print(r.stderr.decode().strip())
+    return r.stdout.decode()
 
 
 class TestPythonAPIAccess(BaseTest):
@@ -42,6 +48,13 @@ class TestPythonAPIAccess(BaseTest):
     def name(self):
         return 'Test running an API script against pyenergyplus'
 
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        return [
+            'pyenergyplus', 'python_standard_lib',
+            'ExampleFiles/1ZoneUncontrolled.idf', 'ExampleFiles/PythonPluginCustomOutputVariable.*'
+        ]
+
     @staticmethod
     def _api_script_content(install_root: str) -> str:
         if platform.system() in ['Linux', 'Darwin']:
@@ -87,40 +100,53 @@ class TestPythonAPIAccess(BaseTest):
             raise e
 
 
+def cmake_env(this_os: int) -> dict:
+    my_env = os.environ.copy()
+    if this_os == OS.Mac:  # my local comp didn't have cmake in path except in interact shells
+        my_env["PATH"] = "/usr/local/bin:" + my_env["PATH"]
+    return my_env
+
+
+def cmake_configure_command(this_os: int, bitness: str, msvc_version: int) -> List[str]:
+    command_line = ['cmake', '..']
+    if this_os == OS.Windows:
+        if bitness not in ['x32', 'x64']:
+            raise EPTestingException('Bad bitness sent to make_build_dir_and_build, should be x32 or x64')
+        if msvc_version == 15:
+            if bitness == 'x64':
+                command_line.extend(['-G', 'Visual Studio 15 Win64'])
+            elif bitness == 'x32':
+                command_line.extend(['-G', 'Visual Studio 15'])  # defaults to 32
+        elif msvc_version == 16:
+            if bitness == 'x64':
+                command_line.extend(['-G', 'Visual Studio 16 2019', '-A', 'x64'])  # default to 64, but be explicit
+            elif bitness == 'x32':
+                command_line.extend(['-G', 'Visual Studio 16 2019', '-A', 'x86'])
+
+        elif msvc_version == 17:
+            if bitness == 'x64':
+                command_line.extend(['-G', 'Visual Studio 17 2022', '-A', 'x64'])  # default to 64, but be explicit
+            elif bitness == 'x32':
+                command_line.extend(['-G', 'Visual Studio 17 2022', '-A', 'x86'])
+        else:
+            raise EPTestingException("Unknown msvc_version passed to make_build_dir_and_build")
+    return command_line
+
+
+def cmake_build_command() -> List[str]:
+    command_line = ['cmake', '--build', '.']
+    if platform.system() == 'Windows':
+        command_line.extend(['--config', 'Release'])
+    return command_line
+
+
 def make_build_dir_and_build(cmake_build_dir: str, verbose: bool, this_os: int, bitness: str, msvc_version: int):
     try:
         os.makedirs(cmake_build_dir)
-        my_env = os.environ.copy()
-        if this_os == OS.Mac:  # my local comp didn't have cmake in path except in interact shells
-            my_env["PATH"] = "/usr/local/bin:" + my_env["PATH"]
-        command_line = ['cmake', '..']
-        if this_os == OS.Windows:
-            if bitness not in ['x32', 'x64']:
-                raise EPTestingException('Bad bitness sent to make_build_dir_and_build, should be x32 or x64')
-            if msvc_version == 15:
-                if bitness == 'x64':
-                    command_line.extend(['-G', 'Visual Studio 15 Win64'])
-                elif bitness == 'x32':
-                    command_line.extend(['-G', 'Visual Studio 15'])  # defaults to 32
-            elif msvc_version == 16:
-                if bitness == 'x64':
-                    command_line.extend(['-G', 'Visual Studio 16 2019', '-A', 'x64'])  # default to 64, but be explicit
-                elif bitness == 'x32':
-                    command_line.extend(['-G', 'Visual Studio 16 2019', '-A', 'x86'])
-
-            elif msvc_version == 17:
-                if bitness == 'x64':
-                    command_line.extend(['-G', 'Visual Studio 17 2022', '-A', 'x64'])  # default to 64, but be explicit
-                elif bitness == 'x32':
-                    command_line.extend(['-G', 'Visual Studio 17 2022', '-A', 'x86'])
-            else:
-                raise EPTestingException("Unknown msvc_version passed to make_build_dir_and_build")
-
-        my_check_call(verbose, command_line, cwd=cmake_build_dir, env=my_env)
-        command_line = ['cmake', '--build', '.']
-        if platform.system() == 'Windows':
-            command_line.extend(['--config', 'Release'])
-        my_check_call(verbose, command_line, env=my_env, cwd=cmake_build_dir)
+        my_env = cmake_env(this_os)
+        configure_command = cmake_configure_command(this_os, bitness, msvc_version)
+        my_check_call(verbose, configure_command, profile=False, cwd=cmake_build_dir, env=my_env)
+        my_check_call(verbose, cmake_build_command(), profile=False, env=my_env, cwd=cmake_build_dir)
         print(' [COMPILED] ', end='')
     except EPTestingException as e:
         print("C API Wrapper Compilation Failed!")
@@ -140,6 +166,10 @@ class TestCAPIAccess(BaseTest):
     def name(self):
         return 'Test running an API script against energyplus in C'
 
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        return ['include']
+
     @staticmethod
     def _api_fixup_content() -> str:
         template_file = os.path.join(api_resource_dir(), 'eager_cpp_fixup.txt')
@@ -167,19 +197,9 @@ class TestCAPIAccess(BaseTest):
         template = open(template_file).read()
         return template
 
-    def run(self, install_root: str, verbose: bool, kwargs: dict):
-        self.verbose = verbose
-        print('* Running test class "%s"... ' % self.__class__.__name__, end='')
-        if 'os' not in kwargs:
-            raise EPTestingException('Bad call to %s -- must pass os in kwargs' % self.__class__.__name__)
-        if 'bitness' not in kwargs:
-            raise EPTestingException('Bad call to %s -- must pass bitness in kwargs' % self.__class__.__name__)
-        self.os = kwargs['os']
-        self.bitness = kwargs['bitness']
-        self.msvc_version = kwargs['msvc_version']
-        build_dir = mkdtemp()
-        c_file_name = self.source_file_name
-        c_file_path = os.path.join(build_dir, c_file_name)
+    def write_build_files(self, build_dir: str, install_root: str) -> None:
+        """Writes the source, CMakeLists.txt and fixup script for the harness into build_dir"""
+        c_file_path = os.path.join(build_dir, self.source_file_name)
         with open(c_file_path, 'w') as f:
             f.write(self._api_script_content())
         print(' [SRC FILE WRITTEN] ', end='')
@@ -191,13 +211,28 @@ class TestCAPIAccess(BaseTest):
         with open(fixup_cmake_path, 'w') as f:
             f.write(self._api_fixup_content())
         print(' [FIXUP CMAKE WRITTEN] ', end='')
+
+    def built_binary_path(self, cmake_build_dir: str) -> str:
+        if self.os == OS.Windows:  # override the path/name for Windows
+            return os.path.join(cmake_build_dir, 'Release', self.target_name + '.exe')
+        return os.path.join(cmake_build_dir, self.target_name)
+
+    def run(self, install_root: str, verbose: bool, kwargs: dict):
+        self.verbose = verbose
+        print('* Running test class "%s"... ' % self.__class__.__name__, end='')
+        if 'os' not in kwargs:
+            raise EPTestingException('Bad call to %s -- must pass os in kwargs' % self.__class__.__name__)
+        if 'bitness' not in kwargs:
+            raise EPTestingException('Bad call to %s -- must pass bitness in kwargs' % self.__class__.__name__)
+        self.os = kwargs['os']
+        self.bitness = kwargs['bitness']
+        self.msvc_version = kwargs['msvc_version']
+        build_dir = mkdtemp()
+        self.write_build_files(build_dir, install_root)
         cmake_build_dir = os.path.join(build_dir, 'build')
         make_build_dir_and_build(cmake_build_dir, self.verbose, self.os, self.bitness, self.msvc_version)
         try:
-            new_binary_path = os.path.join(cmake_build_dir, self.target_name)
-            if self.os == OS.Windows:  # override the path/name for Windows
-                new_binary_path = os.path.join(cmake_build_dir, 'Release', self.target_name + '.exe')
-            command_line = [new_binary_path]
+            command_line = [self.built_binary_path(cmake_build_dir)]
             my_check_call(self.verbose, command_line, cwd=install_root)
         except EPTestingException as e:
             print('C API Wrapper Execution failed!')
@@ -205,6 +240,116 @@ class TestCAPIAccess(BaseTest):
         print(' [DONE]!')
 
 
+class TestCAPIRuntimeCallbackOverhead(TestCAPIAccess):
+    """Measures the overhead of runtime API callbacks and data exchange calls from a compiled C++ harness
+
+    The harness runs a design day simulation through the runtime API three ways: with no callbacks, with a no-op
+    end-of-zone-timestep callback, and with a callback that looks up a variable and an actuator handle and reads both
+    values every zone timestep.  Whole-run wall times are compared for the callback cost, and the lookups and getters
+    are timed directly inside the harness.  The callback costs are differences of small numbers, so they are reported
+    next to the spread of the repeated runs, and left out when the difference is negative, i.e. lost in that noise.
+    """
+
+    Modes = ['none', 'noop', 'exchange']
+
+    def __init__(self):
+        super().__init__()
+        self.source_file_name = 'runtime.cpp'
+        self.target_name = 'TestCAPIRuntimeCallbacks'
+
+    def name(self):
+        return 'Test the overhead of runtime API callbacks and data exchange calls from C++'
+
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        return ['include', 'ExampleFiles/' + kwargs.get('test_file', '5ZoneAirCooled.idf')]
+
+    @staticmethod
+    def _api_script_content() -> str:
+        template_file = os.path.join(api_resource_dir(), 'runtime_callback_source.cpp')
+        template = open(template_file).read()
+        return template
+
+    @staticmethod
+    def _parse_harness_output(output: str) -> dict:
+        values = {}
+        for line in output.splitlines():
+            key, _, value = line.strip().partition('=')
+            if value:
+                values[key] = float(value)
+        return values
+
+    def run(self, install_root: str, verbose: bool, kwargs: dict):
+        self.verbose = verbose
+        print('* Running test class "%s"... ' % self.__class__.__name__, end='')
+        if 'os' not in kwargs:
+            raise EPTestingException('Bad call to %s -- must pass os in kwargs' % self.__class__.__name__)
+        if 'bitness' not in kwargs:
+            raise EPTestingException('Bad call to %s -- must pass bitness in kwargs' % self.__class__.__name__)
+        self.os = kwargs['os']
+        self.bitness = kwargs['bitness']
+        self.msvc_version = kwargs['msvc_version']
+        test_file = kwargs.get('test_file', '5ZoneAirCooled.idf')
+        repeats = kwargs.get('repeats', 3)
+        build_dir = mkdtemp()
+        self.write_build_files(build_dir, install_root)
+        cmake_build_dir = os.path.join(build_dir, 'build')
+        make_build_dir_and_build(cmake_build_dir, self.verbose, self.os, self.bitness, self.msvc_version)
+        idf_path = os.path.join(install_root, 'ExampleFiles', test_file)
+        my_env = os.environ.copy()
+        if self.os == OS.Windows:
+            my_env["PATH"] = install_root + ";" + my_env["PATH"]
+        runs = {}
+        spreads = {}
+        try:
+            for mode in self.Modes:
+                # take the fastest of several runs, the differences we are after are small compared to the noise
+                wall_times = []
+                for _ in range(repeats):
+                    output_dir = mkdtemp()
+                    output = my_check_call(
+                        self.verbose, [self.built_binary_path(cmake_build_dir), mode, output_dir, idf_path],
+                        cwd=install_root, env=my_env
+                    )
+                    values = self._parse_harness_output(output)
+                    wall_times.append(values['wall_seconds'])
+                    if mode not in runs or values['wall_seconds'] < runs[mode]['wall_seconds']:
+                        runs[mode] = values
+                spreads[mode] = max(wall_times) - min(wall_times)
+                print(' [%s: %.2fs] ' % (mode.upper(), runs[mode]['wall_seconds']), end='')
+        except EPTestingException as e:
+            print('C API Runtime Callback Harness Execution failed!')
+            raise e
+        callbacks = runs['noop']['callbacks']
+        if callbacks == 0:
+            raise EPTestingException('The runtime callback was never called, something is wrong with the harness')
+        exchange = runs['exchange']
+        if exchange['lookup_calls'] == 0 or exchange['getter_calls'] == 0:
+            raise EPTestingException('The exchange callback never got to the data exchange calls, was the API ready?')
+        measurements = {
+            'wall_time_no_callback': runs['none']['wall_seconds'],
+            'wall_time_noop_callback': runs['noop']['wall_seconds'],
+            'wall_time_exchange_callback': exchange['wall_seconds'],
+            'repeat_spread': spreads,  # max - min wall seconds over the repeats of each mode
+            'callbacks': callbacks,
+            'time_per_handle_lookup': exchange['lookup_seconds'] / exchange['lookup_calls'],
+            'time_per_value_getter': exchange['getter_seconds'] / exchange['getter_calls'],
+        }
+        for key, (slower, faster) in [('overhead_per_callback', ('noop', 'none')),
+                                      ('exchange_overhead_per_callback', ('exchange', 'noop'))]:
+            overhead = (runs[slower]['wall_seconds'] - runs[faster]['wall_seconds']) / callbacks
+            noise = (spreads[slower] + spreads[faster]) / callbacks
+            if overhead < 0:
+                print(' [%s LOST IN NOISE: %.2f +/- %.2f US] ' % (key.upper(), overhead * 1e6, noise * 1e6), end='')
+            else:
+                measurements[key] = overhead
+                print(' [%s %.2f +/- %.2f US] ' % (key.upper(), overhead * 1e6, noise * 1e6), end='')
+        print(' [%i CALLBACKS, %.3f US/LOOKUP, %.3f US/GETTER] [DONE]!' % (
+            callbacks, measurements['time_per_handle_lookup'] * 1e6, measurements['time_per_value_getter'] * 1e6
+        ))
+        return measurements
+
+
 class TestCppAPIDelayedAccess(BaseTest):
 
     def __init__(self):
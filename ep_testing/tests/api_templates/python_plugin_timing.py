@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+import json
+import sys
+import time
+sys.path.insert(0, '%s')
+from pyenergyplus.api import EnergyPlusAPI  # noqa: E402
+# the timings go to a file rather than stdout, where a profiler wrapping this script may also write
+timing_path = sys.argv[1]
+api = EnergyPlusAPI()
+state = api.state_manager.new_state()
+api.runtime.set_console_output_status(state, False)
+timing = {'callbacks': 0, 'first_callback_seconds': None}
+start = time.perf_counter()
+
+
+def on_zone_timestep(_state):
+    if timing['first_callback_seconds'] is None:
+        timing['first_callback_seconds'] = time.perf_counter() - start
+    timing['callbacks'] += 1
+
+
+api.runtime.callback_end_zone_timestep_after_zone_reporting(state, on_zone_timestep)
+start = time.perf_counter()
+status = api.runtime.run_energyplus(state, sys.argv[2:])
+timing['wall_seconds'] = time.perf_counter() - start
+with open(timing_path, 'w') as f:
+    json.dump(timing, f)
+sys.exit(status)
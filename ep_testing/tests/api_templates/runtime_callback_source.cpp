@@ -0,0 +1,80 @@
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <string>
+#include <EnergyPlus/api/datatransfer.h>
+#include <EnergyPlus/api/runtime.h>
+#include <EnergyPlus/api/state.h>
+
+using Clock = std::chrono::steady_clock;
+
+static long callbackCount = 0;
+static long lookupCalls = 0;
+static long getterCalls = 0;
+static double lookupSeconds = 0.0;
+static double getterSeconds = 0.0;
+static double checksum = 0.0;
+
+static double secondsSince(Clock::time_point start) {
+    return std::chrono::duration<double>(Clock::now() - start).count();
+}
+
+void noOpCallback(EnergyPlusState) {
+    ++callbackCount;
+}
+
+void exchangeCallback(EnergyPlusState state) {
+    ++callbackCount;
+    if (apiDataFullyReady(state) == 0) {
+        return;
+    }
+    // deliberately look the handles up every time, that is part of what we are measuring
+    auto start = Clock::now();
+    int variableHandle = getVariableHandle(state, "Site Outdoor Air Drybulb Temperature", "Environment");
+    int actuatorHandle = getActuatorHandle(state, "Weather Data", "Outdoor Dry Bulb", "Environment");
+    lookupSeconds += secondsSince(start);
+    lookupCalls += 2;
+    if (variableHandle == -1 || actuatorHandle == -1) {
+        fprintf(stderr, "Could not get handles, variable: %d, actuator: %d\n", variableHandle, actuatorHandle);
+        exit(1);
+    }
+    start = Clock::now();
+    Real64 variableValue = getVariableValue(state, variableHandle);
+    Real64 actuatorValue = getActuatorValue(state, actuatorHandle);
+    getterSeconds += secondsSince(start);
+    getterCalls += 2;
+    checksum += variableValue + actuatorValue;  // keeps the getters from being optimized away
+}
+
+int main(int argc, const char *argv[]) {
+    if (argc != 4) {
+        fprintf(stderr, "usage: %s <none|noop|exchange> <output dir> <idf>\n", argv[0]);
+        return 1;
+    }
+    std::string mode = argv[1];
+    EnergyPlusState state = stateNew();
+    setConsoleOutputState(state, 0);
+    if (mode == "noop") {
+        callbackEndOfZoneTimeStepAfterZoneReporting(state, noOpCallback);
+    } else if (mode == "exchange") {
+        requestVariable(state, "Site Outdoor Air Drybulb Temperature", "Environment");
+        callbackEndOfZoneTimeStepAfterZoneReporting(state, exchangeCallback);
+    } else if (mode != "none") {
+        fprintf(stderr, "Unknown mode %s\n", argv[1]);
+        return 1;
+    }
+    const char *eplusArgs[] = {"energyplus", "-D", "-d", argv[2], argv[3]};
+    auto start = Clock::now();
+    int status = energyplus(state, 5, eplusArgs);
+    double wallSeconds = secondsSince(start);
+    printf("status=%d\n", status);
+    printf("wall_seconds=%.9f\n", wallSeconds);
+    printf("callbacks=%ld\n", callbackCount);
+    printf("lookup_calls=%ld\n", lookupCalls);
+    printf("lookup_seconds=%.9f\n", lookupSeconds);
+    printf("getter_calls=%ld\n", getterCalls);
+    printf("getter_seconds=%.9f\n", getterSeconds);
+    printf("checksum=%.3f\n", checksum);
+    stateDelete(state);
+    return status;
+}
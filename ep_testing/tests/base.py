@@ -1,5 +1,6 @@
 from os import chdir
 from tempfile import mkdtemp
+from typing import List
 
 
 class BaseTest:
@@ -13,5 +14,14 @@ class BaseTest:
     def name(self):
         raise NotImplementedError('name() must be overridden by derived classes')
 
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        """Returns the install-relative paths (or glob patterns) this test needs from the package
+
+        Root level files (the energyplus binary, the IDD, the API library, etc.) are always extracted, so derived
+        classes only need to list the subdirectories and example files they touch.
+        """
+        return []
+
     def run(self, install_root: str, verbose: bool, kwargs: dict):
         raise NotImplementedError('run() must be overridden by derived classes')
@@ -1,7 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
 import os
+import subprocess
 from subprocess import check_call, CalledProcessError, STDOUT
+import time
+from typing import List, Tuple
 
 from ep_testing.exceptions import EPTestingException
+from ep_testing.profiling import profiled
 from ep_testing.tests.base import BaseTest
 
 
@@ -10,6 +15,10 @@ class TestVersionInfoInDocumentation(BaseTest):
     def name(self):
         return 'Verify contents in a PDF'
 
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        return ['Documentation/' + kwargs['pdf_file']]
+
     def run(self, install_root: str, verbose: bool, kwargs: dict):
         if 'pdf_file' not in kwargs:
             raise EPTestingException('Bad call to %s -- must pass pdf_file in kwargs' % self.__class__.__name__)
@@ -26,14 +35,15 @@ class TestVersionInfoInDocumentation(BaseTest):
         dev_null = open(os.devnull, 'w')
         try:
             check_call(
-                ['pdftk', original_pdf_path, 'cat', '1', 'output', target_pdf_path], stdout=dev_null, stderr=STDOUT
+                profiled(['pdftk', original_pdf_path, 'cat', '1', 'output', target_pdf_path]), stdout=dev_null,
+                stderr=STDOUT
             )
             print(' [PAGE1_EXTRACTED] ', end='')
         except CalledProcessError:
             raise EPTestingException('PdfTk Page 1 extraction failed!')
         target_txt_path = target_pdf_path + '.txt'
         try:
-            check_call(['pdftotext', target_pdf_path, target_txt_path], stdout=dev_null, stderr=STDOUT)
+            check_call(profiled(['pdftotext', target_pdf_path, target_txt_path]), stdout=dev_null, stderr=STDOUT)
             print(' [PAGE1_CONVERTED] ', end='')
         except CalledProcessError:
             raise EPTestingException('PdfToText Page 1 conversion failed!')
@@ -46,3 +56,67 @@ class TestVersionInfoInDocumentation(BaseTest):
                     'Did not find matching version string in PDF front page, page contents = \n%s' % contents
                 )
         os.chdir(saved_dir)
+
+
+class TestVersionInfoInAllDocumentation(BaseTest):
+    """Checks the version string on the first page of every PDF in the Documentation directory, all at once
+
+    Each PDF gets a single pdftotext call that converts only page 1 straight to stdout, so nothing is written into the
+    install tree, and all the calls run concurrently so the whole set takes about as long as the slowest PDF.
+    """
+
+    def name(self):
+        return 'Verify the version string on the first page of every documentation PDF'
+
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        return ['Documentation']
+
+    @staticmethod
+    def _first_page_text(pdf_path: str) -> Tuple[str, float]:
+        start = time.time()
+        r = subprocess.run(profiled(['pdftotext', '-q', '-f', '1', '-l', '1', pdf_path, '-']),
+                           stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if r.returncode != 0:
+            raise EPTestingException(
+                f'PdfToText Page 1 conversion failed for {pdf_path} with exit status {r.returncode}!\n'
+                f'{r.stderr.decode(errors="replace").strip()}'
+            )
+        return r.stdout.decode(errors='replace'), time.time() - start
+
+    def run(self, install_root: str, verbose: bool, kwargs: dict):
+        if 'version_string' not in kwargs:
+            raise EPTestingException('Bad call to %s -- must pass version_string in kwargs' % self.__class__.__name__)
+        version_string = kwargs['version_string']
+        documentation_dir = os.path.join(install_root, 'Documentation')
+        if not os.path.isdir(documentation_dir):
+            print('* Running test class "%s"... ' % self.__class__.__name__, end='')
+            raise EPTestingException('Could not find the Documentation directory at %s' % documentation_dir)
+        pdf_paths = sorted(
+            f.path for f in os.scandir(documentation_dir) if f.is_file() and f.name.lower().endswith('.pdf')
+        )
+        print('* Running test class "%s" on %i files... ' % (self.__class__.__name__, len(pdf_paths)), end='')
+        if not pdf_paths:
+            raise EPTestingException('Could not find any PDFs in %s' % documentation_dir)
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=len(pdf_paths)) as executor:
+            results = list(executor.map(self._first_page_text, pdf_paths))
+        wall_time = time.time() - start
+        print(' [PAGE1_CONVERTED] ', end='')
+        file_times = {}
+        missing = []
+        for pdf_path, (contents, file_time) in zip(pdf_paths, results):
+            file_times[os.path.basename(pdf_path)] = file_time
+            if version_string not in contents:
+                missing.append(os.path.basename(pdf_path))
+        if missing:
+            raise EPTestingException('Did not find matching version string "%s" on the front page of: %s' % (
+                version_string, ', '.join(missing)
+            ))
+        print(' [FOUND VERSION STRING IN ALL FILES IN %.1fs, SLOWEST FILE %.1fs] [DONE]!' % (
+            wall_time, max(file_times.values())
+        ))
+        if verbose:
+            for pdf_name, file_time in sorted(file_times.items(), key=lambda x: -x[1]):
+                print('    %-60s %6.2f s' % (pdf_name, file_time))
+        return {'wall_time': wall_time, 'file_times': file_times}
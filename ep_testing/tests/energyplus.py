@@ -1,15 +1,46 @@
 import os
 import subprocess
+from typing import List, Optional
 
 from ep_testing.exceptions import EPTestingException
+from ep_testing.profiling import profiled
 from ep_testing.tests.base import BaseTest
 
 
+def run_design_day_simulation(eplus_binary: str, idf_path: str, output_dir: Optional[str] = None) -> None:
+    """Runs an IDF for its design days only, in output_dir if given (otherwise the current directory)"""
+    cmd = [eplus_binary, '-D', idf_path]
+    if output_dir is not None:
+        cmd = [eplus_binary, '-D', '-d', output_dir, idf_path]
+    r = subprocess.run(profiled(cmd), stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=output_dir)
+    if r.returncode != 0:
+        raise EPTestingException(
+            'EnergyPlus failed!\n'
+            f'Command {cmd} failed with exit status {r.returncode}!\n'
+            'stderr:\n'
+            f'{r.stderr.decode().strip()}'
+            '\n\n'
+            'stdout:\n'
+            f'{r.stdout.decode().strip()}')
+
+
 class TestPlainDDRunEPlusFile(BaseTest):
 
     def name(self):
         return 'Test running IDF and make sure it exits OK'
 
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        test_file = kwargs['test_file']
+        paths = ['ExampleFiles/' + test_file]
+        if test_file.startswith('PythonPlugin'):
+            # the plugin python file sits next to the IDF, and E+ needs its embedded python runtime to run it, including
+            # pyenergyplus, which the plugin imports its EnergyPlusPlugin base class from
+            paths.extend([
+                'ExampleFiles/' + os.path.splitext(test_file)[0] + '.py', 'python_standard_lib', 'pyenergyplus'
+            ])
+        return paths
+
     def run(self, install_root: str, verbose: bool, kwargs: dict):
         if 'test_file' not in kwargs:
             raise EPTestingException('Bad call to %s -- must pass test_file in kwargs' % self.__class__.__name__)
@@ -27,17 +58,5 @@ class TestPlainDDRunEPlusFile(BaseTest):
         else:
             eplus_binary_to_use = eplus_binary
 
-        cmd = [eplus_binary_to_use, '-D', idf_path]
-        r = subprocess.run(cmd,
-                           stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if r.returncode == 0:
-            print(' [DONE]!')
-        else:
-            raise EPTestingException(
-                'EnergyPlus failed!\n'
-                f'Command {cmd} failed with exit status {r.returncode}!\n'
-                'stderr:\n'
-                f'{r.stderr.decode().strip()}'
-                '\n\n'
-                'stdout:\n'
-                f'{r.stdout.decode().strip()}')
+        run_design_day_simulation(eplus_binary_to_use, idf_path)
+        print(' [DONE]!')
@@ -1,8 +1,10 @@
 import os
 from shutil import copyfile
 from subprocess import check_call, CalledProcessError, STDOUT
+from typing import List
 
 from ep_testing.exceptions import EPTestingException
+from ep_testing.profiling import profiled
 from ep_testing.tests.base import BaseTest
 
 
@@ -11,6 +13,10 @@ class TestExpandObjectsAndRun(BaseTest):
     def name(self):
         return 'Test running ExpandObjects on a template file and make sure it exits OK'
 
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        return ['ExampleFiles/' + kwargs['test_file']]
+
     def run(self, install_root: str, verbose: bool, kwargs: dict):
         if 'test_file' not in kwargs:
             raise EPTestingException('Bad call to %s -- must pass test_file in kwargs' % self.__class__.__name__)
@@ -29,7 +35,7 @@ class TestExpandObjectsAndRun(BaseTest):
         expand_objects_binary = os.path.join(install_root, 'ExpandObjects')
         dev_null = open(os.devnull, 'w')
         try:
-            check_call([expand_objects_binary], stdout=dev_null, stderr=STDOUT)
+            check_call(profiled([expand_objects_binary]), stdout=dev_null, stderr=STDOUT)
         except CalledProcessError:
             raise EPTestingException('ExpandObjects failed!')
         expanded_idf_path = os.path.join(os.getcwd(), 'expanded.idf')
@@ -43,7 +49,7 @@ class TestExpandObjectsAndRun(BaseTest):
         copyfile(expanded_idf_path, target_idf_path)
         eplus_binary = os.path.join(install_root, 'energyplus')
         try:
-            check_call([eplus_binary, '-D', target_idf_path], stdout=dev_null, stderr=STDOUT)
+            check_call(profiled([eplus_binary, '-D', target_idf_path]), stdout=dev_null, stderr=STDOUT)
             print(' [DONE]!')
         except CalledProcessError:
             raise EPTestingException('EnergyPlus failed!')
@@ -0,0 +1,170 @@
+import os
+import queue
+import shutil
+import threading
+import time
+from tempfile import mkdtemp
+from typing import List, Optional
+
+from ep_testing.exceptions import EPTestingException
+from ep_testing.tests.api import my_check_call
+from ep_testing.tests.base import BaseTest
+
+
+class StageStats:
+    """Timing and queue depth bookkeeping for one stage of the pipeline, safe to update from worker threads"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.completed = 0
+        self.busy_time = 0.0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+        self.queue_depths: List[int] = []
+        self._lock = threading.Lock()
+
+    def record_item(self, start: float, end: float) -> None:
+        with self._lock:
+            self.completed += 1
+            self.busy_time += end - start
+            self.first_start = start if self.first_start is None else min(self.first_start, start)
+            self.last_end = end if self.last_end is None else max(self.last_end, end)
+
+    def record_queue_depth(self, depth: int) -> None:
+        with self._lock:
+            self.queue_depths.append(depth)
+
+    def summary(self) -> dict:
+        span = (self.last_end - self.first_start) if self.completed else 0.0
+        return {
+            'completed': self.completed,
+            'busy_time': self.busy_time,
+            'throughput': self.completed / span if span > 0 else 0.0,
+            'max_queue_depth': max(self.queue_depths, default=0),
+            'mean_queue_depth': sum(self.queue_depths) / len(self.queue_depths) if self.queue_depths else 0.0,
+        }
+
+
+class TestPostProcessPipeline(BaseTest):
+    """Simulates a batch of example files while a separate pool of workers post-processes finished output dirs
+
+    Each finished simulation directory is queued to the post-processing workers, which run HVAC-Diagram,
+    ReadVarsESO and convertESOMTR on it, so post-processing overlaps with the simulations that are still running.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.errors: List[Exception] = []
+        self._errors_lock = threading.Lock()
+
+    def name(self):
+        return 'Test simulating a batch of files with overlapped HVAC-Diagram, ReadVarsESO and convertESOMTR'
+
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        return ['ExampleFiles/' + f for f in kwargs['test_files']] + [
+            'PostProcess/HVAC-Diagram*', 'PostProcess/ReadVarsESO*', 'PostProcess/convertESOMTR'
+        ]
+
+    def _record_error(self, e: Exception) -> None:
+        with self._errors_lock:
+            self.errors.append(e)
+
+    def _simulate(self, install_root: str, test_file: str) -> str:
+        output_dir = mkdtemp(dir=os.getcwd(), prefix=os.path.splitext(test_file)[0] + '_')
+        eplus_binary = os.path.join(install_root, 'energyplus')
+        idf_path = os.path.join(install_root, 'ExampleFiles', test_file)
+        my_check_call(self.verbose, [eplus_binary, '-D', '-d', output_dir, idf_path])
+        return output_dir
+
+    def _post_process(self, install_root: str, output_dir: str) -> None:
+        post_process_dir = os.path.join(install_root, 'PostProcess')
+        my_check_call(self.verbose, [os.path.join(post_process_dir, 'HVAC-Diagram')], cwd=output_dir)
+        with open(os.path.join(output_dir, 'eplusout.rvi'), 'w') as f:
+            f.write('eplusout.eso\neplusout.csv\n')
+        my_check_call(
+            self.verbose, [os.path.join(post_process_dir, 'ReadVarsESO'), 'eplusout.rvi', 'unlimited'], cwd=output_dir
+        )
+        convert_dir = os.path.join(post_process_dir, 'convertESOMTR')
+        shutil.copy(os.path.join(convert_dir, 'convert.txt'), output_dir)
+        my_check_call(self.verbose, [os.path.join(convert_dir, 'convertESOMTR')], cwd=output_dir)
+        for expected_file in ['eplusout.svg', 'eplusout.csv', 'ip.eso']:
+            if not os.path.exists(os.path.join(output_dir, expected_file)):
+                raise EPTestingException('Post-processing did not produce %s in %s' % (expected_file, output_dir))
+
+    def run(self, install_root: str, verbose: bool, kwargs: dict):
+        self.verbose = verbose
+        if 'test_files' not in kwargs:
+            raise EPTestingException('Bad call to %s -- must pass test_files in kwargs' % self.__class__.__name__)
+        test_files = kwargs['test_files']
+        num_simulation_workers = kwargs.get('simulation_workers', 2)
+        num_post_process_workers = kwargs.get('post_process_workers', 2)
+        print('* Running test class "%s" on %i files... ' % (self.__class__.__name__, len(test_files)), end='')
+        simulation_stats = StageStats('simulation')
+        post_process_stats = StageStats('post_process')
+        simulation_queue = queue.Queue()
+        for test_file in test_files:
+            simulation_queue.put(test_file)
+        post_process_queue = queue.Queue()
+
+        def simulation_worker():
+            while True:
+                try:
+                    test_file_to_run = simulation_queue.get_nowait()
+                except queue.Empty:
+                    return
+                simulation_stats.record_queue_depth(simulation_queue.qsize())
+                start = time.time()
+                try:
+                    output_dir = self._simulate(install_root, test_file_to_run)
+                except Exception as e:
+                    self._record_error(e)
+                    continue
+                simulation_stats.record_item(start, time.time())
+                post_process_queue.put(output_dir)
+                post_process_stats.record_queue_depth(post_process_queue.qsize())
+
+        def post_process_worker():
+            while True:
+                output_dir = post_process_queue.get()
+                if output_dir is None:
+                    return
+                start = time.time()
+                try:
+                    self._post_process(install_root, output_dir)
+                except Exception as e:
+                    self._record_error(e)
+                    continue
+                post_process_stats.record_item(start, time.time())
+
+        start = time.time()
+        simulation_threads = [threading.Thread(target=simulation_worker) for _ in range(num_simulation_workers)]
+        post_process_threads = [threading.Thread(target=post_process_worker) for _ in range(num_post_process_workers)]
+        for t in simulation_threads + post_process_threads:
+            t.start()
+        for t in simulation_threads:
+            t.join()
+        for _ in post_process_threads:
+            post_process_queue.put(None)
+        for t in post_process_threads:
+            t.join()
+        wall_time = time.time() - start
+        if self.errors:
+            print('Post-processing pipeline failed!')
+            raise self.errors[0]
+        measurements = {
+            'wall_time': wall_time,
+            'serial_time': simulation_stats.busy_time + post_process_stats.busy_time,
+            'simulation': simulation_stats.summary(),
+            'post_process': post_process_stats.summary(),
+        }
+        print(' [SIMULATED %i, POST-PROCESSED %i IN %.1fs, %.1fs IF SERIAL] [DONE]!' % (
+            simulation_stats.completed, post_process_stats.completed, wall_time, measurements['serial_time']
+        ))
+        if verbose:
+            for stage in ['simulation', 'post_process']:
+                s = measurements[stage]
+                print('    %-13s %6.2f items/s, max queue depth %i, mean queue depth %.1f' % (
+                    stage, s['throughput'], s['max_queue_depth'], s['mean_queue_depth']
+                ))
+        return measurements
@@ -0,0 +1,181 @@
+import json
+import os
+import platform
+import sys
+from tempfile import mkdtemp, mkstemp
+from typing import List, Tuple
+
+from ep_testing.config import OS
+from ep_testing.exceptions import EPTestingException
+from ep_testing.tests.annual import arrived_at_exit, timestamped_console_lines
+from ep_testing.tests.api import api_resource_dir, my_check_call
+from ep_testing.tests.base import BaseTest
+from ep_testing.profiling import profiled
+
+
+def strip_idf_objects(idf_text: str, class_prefix: str) -> Tuple[str, int]:
+    """Removes every object whose class name starts with class_prefix (case insensitive) from the IDF text
+
+    Returns the remaining text and the number of objects removed.  Objects are assumed to end on their own line, which
+    holds for everything in ExampleFiles.
+    """
+    kept_lines = []
+    pending_lines = []
+    pending_code = ''
+    removed = 0
+    for line in idf_text.splitlines(keepends=True):
+        pending_lines.append(line)
+        pending_code += line.split('!', 1)[0]
+        if ';' not in pending_code:
+            continue
+        class_name = pending_code.split(',', 1)[0].split(';', 1)[0].strip()
+        if class_name.lower().startswith(class_prefix.lower()):
+            removed += 1
+        else:
+            kept_lines.extend(pending_lines)
+        pending_lines = []
+        pending_code = ''
+    kept_lines.extend(pending_lines)
+    return ''.join(kept_lines), removed
+
+
+class TestPythonPluginOverhead(BaseTest):
+    """Measures what Python plugins cost by running a plugin IDF against a copy with its PythonPlugin objects removed
+
+    Both variants run through the energyplus binary, timing the first "Warming up" console line (read through a
+    pseudo-terminal so it is not held back in a buffer, and left out where that cannot be relied on), and through a
+    pyenergyplus script that times the first zone timestep callback and counts timesteps.  Through the binary, the extra
+    delay before the first timestep is embedding the interpreter plus importing the plugins.  Through pyenergyplus the
+    host process already runs an interpreter, so the extra delay there is mostly importing and setting up the plugins.
+    The extra time after the first timestep is calling the plugins every timestep.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.os = None
+
+    def name(self):
+        return 'Test the startup and per-timestep overhead of running Python plugins'
+
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        stem = os.path.splitext(kwargs.get('test_file', 'PythonPluginCustomOutputVariable.idf'))[0]
+        return ['pyenergyplus', 'python_standard_lib', 'ExampleFiles/' + stem + '.*']
+
+    @staticmethod
+    def _api_script_content(install_root: str) -> str:
+        if platform.system() == 'Windows':
+            install_root = install_root.replace('\\', '\\\\')
+        template_file = os.path.join(api_resource_dir(), 'python_plugin_timing.py')
+        template = open(template_file).read()
+        return template % install_root
+
+    @staticmethod
+    def _write_stripped_variant(idf_path: str) -> str:
+        with open(idf_path) as f:
+            stripped, removed = strip_idf_objects(f.read(), 'PythonPlugin:')
+        if removed == 0:
+            raise EPTestingException('No PythonPlugin objects found in %s, nothing to compare against' % idf_path)
+        stripped_dir = mkdtemp(dir=os.getcwd(), prefix='stripped_')
+        stripped_path = os.path.join(stripped_dir, 'NoPlugins_' + os.path.basename(idf_path))
+        with open(stripped_path, 'w') as f:
+            f.write(stripped)
+        return stripped_path
+
+    @staticmethod
+    def _timed_cli_run(eplus_binary: str, idf_path: str) -> dict:
+        """Runs the design days through the binary, timing the whole run and the first warmup line of the console
+
+        The first warmup time is None when the console output only arrived at exit, so it says nothing about startup.
+        """
+        output_dir = mkdtemp(dir=os.getcwd(), prefix='cli_')
+        cmd = [eplus_binary, '-D', '-d', output_dir, idf_path]
+        return_code, timed_lines, wall_seconds = timestamped_console_lines(profiled(cmd), cwd=output_dir)
+        warmup_times = [arrived for arrived, line in timed_lines if line.strip().startswith('Warming up')]
+        if return_code != 0 or not warmup_times:
+            raise EPTestingException(
+                'EnergyPlus failed!\n'
+                f'Command {cmd} failed with exit status {return_code}, or never started warming up!\n'
+                'output:\n'
+                f'{"".join(line for _, line in timed_lines).strip()}')
+        first_timestep_seconds = None if arrived_at_exit(warmup_times[:1], wall_seconds) else warmup_times[0]
+        return {'wall_seconds': wall_seconds, 'first_timestep_seconds': first_timestep_seconds}
+
+    def _fastest_cli_run(self, eplus_binary: str, idf_path: str, repeats: int) -> dict:
+        return min((self._timed_cli_run(eplus_binary, idf_path) for _ in range(repeats)),
+                   key=lambda timing: timing['wall_seconds'])
+
+    def _fastest_api_run(self, script_path: str, idf_path: str, repeats: int, env: dict) -> dict:
+        fastest = None
+        for _ in range(repeats):
+            output_dir = mkdtemp(dir=os.getcwd(), prefix='api_')
+            timing_path = os.path.join(output_dir, 'timing.json')
+            command_line = [sys.executable, script_path, timing_path, '-D', '-d', output_dir, idf_path]
+            my_check_call(self.verbose, command_line, env=env)
+            if not os.path.exists(timing_path):
+                raise EPTestingException('The timing script did not write its timings for %s' % idf_path)
+            with open(timing_path) as f:
+                timing = json.load(f)
+            if timing['first_callback_seconds'] is None:
+                raise EPTestingException('The zone timestep callback was never called while running %s' % idf_path)
+            if fastest is None or timing['wall_seconds'] < fastest['wall_seconds']:
+                fastest = timing
+        return fastest
+
+    def run(self, install_root: str, verbose: bool, kwargs: dict):
+        self.verbose = verbose
+        test_file = kwargs.get('test_file', 'PythonPluginCustomOutputVariable.idf')
+        repeats = kwargs.get('repeats', 3)
+        print('* Running test class "%s" on file "%s"... ' % (self.__class__.__name__, test_file), end='')
+        if 'os' not in kwargs:
+            raise EPTestingException('Bad call to %s -- must pass os in kwargs' % self.__class__.__name__)
+        self.os = kwargs['os']
+        eplus_binary = os.path.join(install_root, 'energyplus')
+        plugin_idf = os.path.join(install_root, 'ExampleFiles', test_file)
+        stripped_idf = self._write_stripped_variant(plugin_idf)
+        print(' [STRIPPED VARIANT WRITTEN] ', end='')
+        cli_plugin = self._fastest_cli_run(eplus_binary, plugin_idf, repeats)
+        cli_stripped = self._fastest_cli_run(eplus_binary, stripped_idf, repeats)
+        measurements = {
+            'cli_wall_time_with_plugins': cli_plugin['wall_seconds'],
+            'cli_wall_time_without_plugins': cli_stripped['wall_seconds'],
+            'cli_plugin_overhead': cli_plugin['wall_seconds'] - cli_stripped['wall_seconds'],
+        }
+        print(' [CLI: %.2fs VS %.2fs] ' % (cli_plugin['wall_seconds'], cli_stripped['wall_seconds']), end='')
+        if cli_plugin['first_timestep_seconds'] is None or cli_stripped['first_timestep_seconds'] is None:
+            print(' [NO CLI STARTUP TIME, CONSOLE OUTPUT ONLY ARRIVED AT EXIT] ', end='')
+        else:
+            cli_startup_cost = cli_plugin['first_timestep_seconds'] - cli_stripped['first_timestep_seconds']
+            measurements['cli_interpreter_startup_time'] = cli_startup_cost
+            print(' [CLI STARTUP %.3fs] ' % cli_startup_cost, end='')
+        if self.os == OS.Mac:
+            # same as TestPythonAPIAccess, running a plugin file from the Python API seg-faults on GHA
+            print(' [API SKIPPED ON MAC] [DONE]!')
+            return measurements
+        handle, script_path = mkstemp(suffix='.py')
+        with os.fdopen(handle, 'w') as f:
+            f.write(self._api_script_content(install_root))
+        my_env = os.environ.copy()
+        if self.os == OS.Windows:
+            my_env["PATH"] = install_root + ";" + my_env["PATH"]
+        try:
+            api_plugin = self._fastest_api_run(script_path, plugin_idf, repeats, my_env)
+            api_stripped = self._fastest_api_run(script_path, stripped_idf, repeats, my_env)
+        except EPTestingException as e:
+            print('Python Plugin Timing Script failed!')
+            raise e
+        timesteps = api_plugin['callbacks']
+        setup_cost = api_plugin['first_callback_seconds'] - api_stripped['first_callback_seconds']
+        plugin_timestep_time = api_plugin['wall_seconds'] - api_plugin['first_callback_seconds']
+        stripped_timestep_time = api_stripped['wall_seconds'] - api_stripped['first_callback_seconds']
+        measurements.update({
+            'api_wall_time_with_plugins': api_plugin['wall_seconds'],
+            'api_wall_time_without_plugins': api_stripped['wall_seconds'],
+            'timesteps': timesteps,
+            'api_plugin_setup_time': setup_cost,
+            'plugin_overhead_per_timestep': (plugin_timestep_time - stripped_timestep_time) / timesteps,
+        })
+        print(' [API PLUGIN SETUP %.3fs, %.1f US/TIMESTEP OVER %i TIMESTEPS] [DONE]!' % (
+            setup_cost, measurements['plugin_overhead_per_timestep'] * 1e6, timesteps
+        ))
+        return measurements
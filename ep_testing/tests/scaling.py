@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+from tempfile import mkdtemp
+from typing import List, Optional
+
+from ep_testing.exceptions import EPTestingException
+from ep_testing.tests.base import BaseTest
+from ep_testing.tests.energyplus import run_design_day_simulation
+
+
+def concurrency_levels(max_concurrency: int) -> List[int]:
+    """Returns 1, 2, 4, ... up to max_concurrency, always ending with max_concurrency itself"""
+    levels = []
+    level = 1
+    while level < max_concurrency:
+        levels.append(level)
+        level *= 2
+    levels.append(max_concurrency)
+    return levels
+
+
+def find_knee(levels: List[int], throughputs: List[float], threshold: float = 0.5) -> Optional[int]:
+    """Returns the first concurrency level whose extra workers each add less than threshold of a single worker's
+    throughput, which is where memory bandwidth or I/O starts to saturate, or None if scaling never falls off"""
+    for i in range(1, len(levels)):
+        marginal_efficiency = (throughputs[i] - throughputs[i - 1]) / (throughputs[0] * (levels[i] - levels[i - 1]))
+        if marginal_efficiency < threshold:
+            return levels[i]
+    return None
+
+
+class TestConcurrencyScaling(BaseTest):
+    """Runs the same batch of design day simulations at increasing concurrency and reports how throughput scales
+
+    Each simulation runs in its own sandbox directory with the same invocation as TestPlainDDRunEPlusFile.
+    """
+
+    def name(self):
+        return 'Test how simulation throughput scales with the number of concurrent energyplus processes'
+
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        return ['ExampleFiles/' + f for f in kwargs['test_files']]
+
+    @staticmethod
+    def _timed_simulation(eplus_binary: str, idf_path: str, sandbox_root: str) -> float:
+        sandbox = mkdtemp(dir=sandbox_root)
+        start = time.time()
+        run_design_day_simulation(eplus_binary, idf_path, sandbox)
+        return time.time() - start
+
+    def run(self, install_root: str, verbose: bool, kwargs: dict):
+        if 'test_files' not in kwargs:
+            raise EPTestingException('Bad call to %s -- must pass test_files in kwargs' % self.__class__.__name__)
+        test_files = kwargs['test_files']
+        max_concurrency = kwargs.get('max_concurrency') or os.cpu_count() or 1
+        levels = concurrency_levels(max_concurrency)
+        # every level runs the identical batch, big enough to keep all workers of the highest level busy
+        batch_size = kwargs.get('batch_size') or max(max_concurrency, len(test_files))
+        batch = [test_files[i % len(test_files)] for i in range(batch_size)]
+        print('* Running test class "%s" with %i simulations at concurrency %s... ' % (
+            self.__class__.__name__, batch_size, levels
+        ), end='')
+        eplus_binary = os.path.join(install_root, 'energyplus')
+        idf_paths = [os.path.join(install_root, 'ExampleFiles', f) for f in batch]
+        results = {}
+        throughputs = []
+        for level in levels:
+            sandbox_root = mkdtemp(dir=os.getcwd(), prefix='concurrency_%i_' % level)
+            start = time.time()
+            with ThreadPoolExecutor(max_workers=level) as executor:
+                durations = list(executor.map(
+                    lambda idf_path: self._timed_simulation(eplus_binary, idf_path, sandbox_root), idf_paths
+                ))
+            wall_time = time.time() - start
+            throughputs.append(batch_size / wall_time)
+            results[level] = {
+                'wall_time': wall_time,
+                'sims_per_second': throughputs[-1],
+                'mean_sim_time': sum(durations) / len(durations),
+            }
+            print(' [%i: %.2f SIMS/SEC] ' % (level, throughputs[-1]), end='')
+        for level in levels:
+            r = results[level]
+            r['slowdown'] = r['mean_sim_time'] / results[1]['mean_sim_time']
+            r['parallel_efficiency'] = r['sims_per_second'] / (level * results[1]['sims_per_second'])
+        knee = find_knee(levels, throughputs)
+        recommended_workers = levels[levels.index(knee) - 1] if knee is not None else max_concurrency
+        knee_text = 'KNEE AT %i' % knee if knee is not None else 'NO KNEE'
+        print('[%s, RECOMMENDED WORKERS %i] [DONE]!' % (knee_text, recommended_workers))
+        if verbose:
+            print('    %11s %14s %14s %10s %11s' % (
+                'concurrency', 'sims/sec', 'mean sim time', 'slowdown', 'efficiency'
+            ))
+            for level in levels:
+                r = results[level]
+                print('    %11i %14.3f %13.2fs %10.2f %11.2f%s' % (
+                    level, r['sims_per_second'], r['mean_sim_time'], r['slowdown'], r['parallel_efficiency'],
+                    '  <- knee' if level == knee else ''
+                ))
+        return {
+            'levels': {str(level): r for level, r in results.items()},
+            'knee': knee,
+            'recommended_workers': recommended_workers,
+        }
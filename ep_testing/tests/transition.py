@@ -1,8 +1,10 @@
 import os
 from subprocess import check_call, CalledProcessError, STDOUT
+from typing import List
 import requests
 
 from ep_testing.exceptions import EPTestingException
+from ep_testing.profiling import profiled
 from ep_testing.tests.base import BaseTest
 
 
@@ -11,6 +13,10 @@ class TransitionOldFile(BaseTest):
     def name(self):
         return 'Test running 1ZoneUncontrolled.idf and make sure it exits OK'
 
+    @staticmethod
+    def package_paths(kwargs: dict) -> List[str]:
+        return ['PreProcess/IDFVersionUpdater']
+
     def run(self, install_root: str, verbose: bool, kwargs: dict):
         if 'last_version' not in kwargs:
             raise EPTestingException('Bad call to %s -- must pass last_version in kwargs' % self.__class__.__name__)
@@ -37,14 +43,14 @@ class TransitionOldFile(BaseTest):
         except Exception as e:
             raise EPTestingException('Could not download file from prior release at %s; error: %s' % (idf_url, str(e)))
         try:
-            check_call([most_recent_binary, os.path.basename(idf_path)], stdout=dev_null, stderr=STDOUT)
+            check_call(profiled([most_recent_binary, os.path.basename(idf_path)]), stdout=dev_null, stderr=STDOUT)
             print(' [TRANSITIONED] ', end='')
         except CalledProcessError:
             raise EPTestingException('Transition failed!')
         os.chdir(install_root)
         eplus_binary = os.path.join(install_root, 'energyplus')
         try:
-            check_call([eplus_binary, '-D', idf_path], stdout=dev_null, stderr=STDOUT)
+            check_call(profiled([eplus_binary, '-D', idf_path]), stdout=dev_null, stderr=STDOUT)
             print(' [DONE]!')
         except CalledProcessError:
             raise EPTestingException('EnergyPlus failed!')
@@ -1,11 +1,6 @@
-from os import path
 from setuptools import setup
-from tempfile import mkdtemp
 import distutils.cmd
-import distutils.log
-from ep_testing.downloader import Downloader
-from ep_testing.tester import Tester
-from ep_testing.config import TestConfiguration, CONFIGURATIONS
+from ep_testing.config import CONFIGURATIONS, WORKLOADS
 
 
 class Runner(distutils.cmd.Command):
@@ -20,6 +15,8 @@ class Runner(distutils.cmd.Command):
                              --msvc-version 16
                              --use-local-copy "path/to/EnergyPlus-9.6.0-ed3a9d36c8-Windows-x86_64"`
 
+    The other options, including the workloads, are described in the README and by `ep-testing --help`.
+
     """
 
     description = 'Run E+ tests on installers for this platform'
@@ -32,6 +29,15 @@ class Runner(distutils.cmd.Command):
          'For OS.Windows only, specifies a MSVC generator to use. 16 is default, you can override'),
         # distutils is already claiming --verbose and setting it as default = 1
         ('verbose-output', None, 'Enable verbose mode'),
+        ('results-store=', None, 'Path to the JSON results store, defaults to ~/.ep_testing/results.json'),
+        ('rerun-failed', None, 'Skip tests that already passed on this exact package'),
+        ('only=', None, 'Comma separated list of test class names to run, e.g. TestPythonAPIAccess'),
+        ('full-extract', None, 'Extract the whole package up front instead of only the paths the tests need'),
+        ('workload=', None,
+         'Which workload to run: sanity (default), documentation, annual, pipeline, scaling, callbacks or plugins'),
+        ('history-database=', None, 'Path to the SQLite history database, defaults to ~/.ep_testing/history.sqlite'),
+        ('overlapped', None, 'Extract the package test by test, overlapping the extraction with the tests'),
+        ('profile=', None, 'Comma separated list of test class names whose subprocesses to run under a profiler'),
     ]
 
     def __init__(self, dist):
@@ -40,12 +46,28 @@ class Runner(distutils.cmd.Command):
         self.use_local_copy = None
         self.msvc_version = None
         self.verbose_output = None
+        self.results_store = None
+        self.rerun_failed = None
+        self.only = None
+        self.full_extract = None
+        self.workload = None
+        self.overlapped = None
+        self.history_database = None
+        self.profile = None
 
     def initialize_options(self):
         self.run_config = None
         self.use_local_copy = None
         self.msvc_version = None
         self.verbose_output = None
+        self.results_store = None
+        self.rerun_failed = None
+        self.only = None
+        self.full_extract = None
+        self.workload = None
+        self.overlapped = None
+        self.history_database = None
+        self.profile = None
 
     def finalize_options(self):
         if self.run_config is None:
@@ -65,34 +87,26 @@ class Runner(distutils.cmd.Command):
         else:
             self.verbose_output = bool(self.verbose_output)
 
-    def run(self):
+        self.rerun_failed = bool(self.rerun_failed)
+        if self.only is not None:
+            self.only = [test_name.strip() for test_name in self.only.split(',') if test_name.strip()]
+        self.full_extract = bool(self.full_extract)
+        if self.workload is None:
+            self.workload = 'sanity'
+        if self.workload not in WORKLOADS:
+            raise Exception("Parameter --workload has invalid value, options are: %s" % ', '.join(WORKLOADS))
+        self.overlapped = bool(self.overlapped)
+        if self.profile is not None:
+            self.profile = [test_name.strip() for test_name in self.profile.split(',') if test_name.strip()]
 
-        c = TestConfiguration(self.run_config, self.msvc_version)
-        self.announce('Attempting to test tag name: %s' % c.tag_this_version, level=distutils.log.INFO)
-        download_dir: str = mkdtemp()
-        local_copy: str = self.use_local_copy
-        if local_copy is None:
-            d = Downloader(c, download_dir, announce=self.announce)
-            local_copy = d.extracted_install_path
-            self.announce(f'EnergyPlus package extracted to: {local_copy}', level=distutils.log.INFO)
-        else:
-            if path.isdir(local_copy):
-                # in this case local copy is already an extracted dir, no need to do anything, just test
-                self.announce(f'Using local EnergyPlus package extracted at: {local_copy}', level=distutils.log.INFO)
-            elif path.isfile(local_copy):
-                self.announce(f'Using local EnergyPlus archive at {local_copy}', level=distutils.log.INFO)
-                # this call will skip downloading, but it will extract it to a new directory
-                d = Downloader(c, download_dir, use_local=local_copy, announce=self.announce)
-                local_copy = d.extracted_install_path
-            else:
-                self.announce(
-                    f'Trying to use local copy at {local_copy}, but it does not exist!  Aborting...',
-                    level=distutils.log.INFO
-                )
-                return
-        t = Tester(c, local_copy, self.verbose_output)
-        # unhandled exceptions should cause this to fail
-        t.run()
+    def run(self):
+        # imported here so setup.py itself (and so `pip install .`) does not need the runtime dependencies like requests
+        from ep_testing.runner import run_tests
+        run_tests(
+            self.run_config, self.msvc_version, self.use_local_copy, self.verbose_output, self.results_store,
+            self.rerun_failed, self.only, self.full_extract, self.workload, self.overlapped,
+            history_database=self.history_database, profile=self.profile, announce=self.announce
+        )
 
 
 # the cmdclass entry below is expecting a Mapping[str, Type(Command)], which is essentially what we have with our
@@ -102,7 +116,9 @@ class Runner(distutils.cmd.Command):
 setup(
     name='EPSanityTester',
     version='0.2',
-    packages=['ep_testing'],
+    packages=['ep_testing', 'ep_testing.tests'],
+    package_data={'ep_testing.tests': ['api_templates/*']},
+    install_requires=['requests'],
     url='github.com/NREL/EnergyPlus',
     license='',
     author='edwin',
@@ -111,4 +127,7 @@ setup(
     cmdclass={
         'run': Runner,
     },
+    entry_points={
+        'console_scripts': ['ep-testing = ep_testing.cli:main'],
+    },
 )
@@ -0,0 +1,41 @@
+import math
+
+from ep_testing.history import _max_split_statistic, detect_change_point, metric_direction
+
+
+def test_clear_step_change_is_found_at_the_step():
+    values = [10.0, 10.2, 9.9, 10.1, 10.0, 9.8, 12.0, 12.1, 11.9, 12.2, 12.0, 11.8]
+    change = detect_change_point(values, permutations=200)
+    assert change['index'] == 6
+    assert change['after_mean'] > change['before_mean']
+    assert math.isclose(change['relative_change'], 0.2, rel_tol=0.05)
+    assert change['p_value'] < 0.05
+
+
+def test_noise_free_step_has_an_infinite_statistic():
+    assert _max_split_statistic([1.0, 1.0, 1.0, 2.0, 2.0, 2.0], 3) == (math.inf, 3)
+
+
+def test_flat_series_is_not_significant():
+    values = [10.0, 10.1, 9.9, 10.05, 9.95, 10.0, 10.1, 9.9, 10.05, 9.95, 10.0, 10.1]
+    assert detect_change_point(values, permutations=200)['p_value'] > 0.05
+    constant = detect_change_point([5.0] * 8, permutations=50)
+    assert constant['t_statistic'] == 0.0
+    assert constant['p_value'] == 1.0
+
+
+def test_too_short_series_is_not_split():
+    assert detect_change_point([1.0, 2.0, 3.0, 4.0, 5.0]) is None
+    assert detect_change_point([1.0] * 4, min_segment=2) is not None
+
+
+def test_metric_direction():
+    assert metric_direction('simulated_hours_per_second') is True
+    assert metric_direction('concurrency.4.sims_per_second') is True
+    assert metric_direction('wall_time') is False
+    assert metric_direction('phase_times.sizing') is False
+    assert metric_direction('resources.user_cpu_time') is False
+    assert metric_direction('overhead_per_callback') is False
+    assert metric_direction('callbacks') is None
+    assert metric_direction('warnings') is None
+    assert metric_direction('repeat_spread.none') is None